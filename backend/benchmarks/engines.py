@@ -0,0 +1,74 @@
+"""
+Compare the real time factor and memory of the transcription engines.
+
+Each engine runs in its own process so that its peak memory is measured alone.
+The faster-whisper engine needs the ctranslate2 extra.
+
+Usage:
+    poetry run python backend/benchmarks/engines.py recording.ogg --model base
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from scribe.audio import audio
+from scribe.text import engines
+
+
+def _run(engine: str, model: str, file_path: str, compute_type: str) -> dict:
+    options = {"compute_type": compute_type} if engine != "whisper" else {}
+    started = time.perf_counter()
+    loaded = engines.load_engine(engine, model, **options)
+    load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    loaded.transcribe(file_path)
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is reported in KB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1_024
+    return {"load": load, "elapsed": elapsed, "peak_mb": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file_path", help="an audio file")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--engines", nargs="+", default=list(engines.ENGINES))
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        result = _run(args.run, args.model, args.file_path, args.compute_type)
+        print(json.dumps(result))
+        return
+
+    duration = audio.duration(args.file_path)
+    print(f"audio: {duration:.1f}s, model {args.model}")
+    for engine in args.engines:
+        proc = subprocess.run(
+            [sys.executable, __file__, args.file_path, "--run", engine]
+            + ["--model", args.model, "--compute-type", args.compute_type],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            errors = proc.stderr.strip().splitlines()
+            reason = errors[-1] if errors else f"exit code {proc.returncode}"
+            print(f"{engine:>15}: failed: {reason}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{engine:>15}: load {result['load']:6.1f}s  "
+            f"transcribe {result['elapsed']:7.1f}s  "
+            f"rtf {result['elapsed'] / duration:.3f}  "
+            f"peak memory {result['peak_mb']:7.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
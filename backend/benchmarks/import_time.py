@@ -0,0 +1,58 @@
+"""
+Measure how long it takes to import the app, which bounds how quickly
+a worker can start serving requests.
+
+Run it from the project root, where the app finds its templates and static files.
+
+Usage:
+    poetry run python backend/benchmarks/import_time.py --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def _import_once(module: str) -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name[1:].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append((int(cumulative), depth, name.strip()))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="scribe.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals = []
+    timings = []
+    for _ in range(args.runs):
+        timings = _import_once(args.module)
+        totals.append(max(cumulative for cumulative, _, _ in timings) / 1_000_000)
+
+    print(
+        f"import {args.module}: median {statistics.median(totals):.3f}s "
+        f"(min {min(totals):.3f}s, max {max(totals):.3f}s, {args.runs} runs)"
+    )
+    print(f"slowest imports of {args.module} in the last run:")
+    direct = [(c, n) for c, depth, n in timings if depth == 1]
+    for cumulative, name in sorted(direct, reverse=True)[: args.top]:
+        print(f"{cumulative / 1_000:10.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
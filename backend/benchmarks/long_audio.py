@@ -0,0 +1,65 @@
+"""
+Benchmark serial transcription against parallel chunked transcription
+of a long recording.
+
+Usage:
+    poetry run python backend/benchmarks/long_audio.py recording.ogg --workers 1 2 4
+"""
+import argparse
+import asyncio
+import time
+
+from scribe.audio import audio
+from scribe.config.settings import settings
+from scribe.text import chunking, executor, text
+
+
+async def _chunked(file_path: str) -> str:
+    return chunking.stitch([s async for s in text.transcribe_chunks(file_path)])
+
+
+async def _warm_up(workers: int, file_path: str):
+    # load the model in every worker so start up time is not measured
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                executor.get_executor(), text.transcribe_window, file_path, 0, 1
+            )
+            for _ in range(workers)
+        ]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file_path", help="a long audio file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    duration = audio.duration(args.file_path)
+    print(f"audio: {duration:.1f}s, chunks of {settings.TRANSCRIPTION_CHUNK_SECONDS}s")
+
+    started = time.perf_counter()
+    text.transcribe(args.file_path)
+    serial = time.perf_counter() - started
+    print(f"serial:           {serial:8.1f}s  rtf {serial / duration:.3f}")
+
+    settings.TRANSCRIPTION_EXECUTOR = "process"
+    for workers in args.workers:
+        executor.shutdown()
+        settings.TRANSCRIPTION_WORKERS = workers
+        asyncio.run(_warm_up(workers, args.file_path))
+
+        started = time.perf_counter()
+        asyncio.run(_chunked(args.file_path))
+        elapsed = time.perf_counter() - started
+        print(
+            f"chunked {workers:2d} workers: {elapsed:8.1f}s  "
+            f"rtf {elapsed / duration:.3f}  speedup {serial / elapsed:.2f}x"
+        )
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Time the translation of a message into every target language, as on publish.
+
+The message is translated twice: first with an empty cache,
+then again as a republished message would be.
+The marian backend runs offline and needs the marian extra.
+
+Usage:
+    poetry run python backend/benchmarks/translation.py message.html --backend marian
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from scribe.config.settings import settings
+from scribe.text import text
+
+
+async def _publish(message: str, languages: list) -> float:
+    started = time.perf_counter()
+    await text.translate_all(message, languages)
+    return time.perf_counter() - started
+
+
+async def _run(message: str, languages: list):
+    try:
+        cold = await _publish(message, languages)
+        warm = await _publish(message, languages)
+    finally:
+        await text.close_translator()
+
+    print(f"{len(message)} characters into {', '.join(languages)}")
+    print(f"  empty cache: {cold:7.2f}s")
+    print(f"  republished: {warm:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file_path", help="an HTML message")
+    parser.add_argument("--backend", default=settings.TRANSLATION_BACKEND)
+    parser.add_argument("--languages", nargs="+", default=settings.TARGET_LANGUAGES)
+    args = parser.parse_args()
+
+    with open(args.file_path, "r", encoding="utf-8") as f:
+        message = f.read()
+
+    settings.PSEUDO_TRANSLATE = False
+    settings.TRANSLATION_BACKEND = args.backend
+    settings.TRANSLATION_TIMEOUT_SECONDS = 3_600
+    with tempfile.TemporaryDirectory() as cache:
+        settings.UPLOAD_PATH = cache
+        asyncio.run(_run(message, args.languages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+This module decodes uploaded recordings into the waveform the models consume.
+
+Recordings are decoded once, when they are uploaded, into 16 kHz mono int16 PCM
+saved as a `.npy` file next to the upload. Transcription memory maps that file,
+so windows and chunks read only the samples they need and retries or other
+models never run ffmpeg again. Live recordings are decoded as they are received
+and their PCM file grows with them.
+"""
+import logging
+import os
+import subprocess
+import threading
+from typing import IO, Optional
+
+import numpy as np
+
+# whisper models expect 16 kHz audio
+SAMPLE_RATE = 16000
+
+PCM_EXTENSION = ".npy"
+
+
+def decode(
+    file_path: str, start: Optional[float] = None, end: Optional[float] = None
+) -> np.ndarray:
+    """
+    Decode part of an audio file with ffmpeg into 16 kHz mono PCM
+
+    :param file_path: the path to the audio file
+    :param start: the offset in seconds to start decoding from
+    :param end: the offset in seconds to stop decoding at
+    :return: int16 samples
+    """
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if start:
+        cmd += ["-ss", str(start)]
+    if end is not None:
+        cmd += ["-t", str(end - (start or 0))]
+    cmd += ["-i", file_path, "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le"]
+    cmd += ["-ar", str(SAMPLE_RATE), "-"]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as err:
+        raise RuntimeError(f"Failed to load audio: {err.stderr.decode()}") from err
+
+    return np.frombuffer(out, np.int16).flatten()
+
+
+def is_pcm(file_path: str) -> bool:
+    """
+    Check if a file is decoded PCM written by preprocess
+
+    :param file_path: the path to the audio file
+    :return: True for PCM files
+    """
+    return file_path.endswith(PCM_EXTENSION)
+
+
+def pcm_path(file_path: str) -> str:
+    """
+    The path of the PCM file decoded from an audio file
+
+    :param file_path: the path to the audio file
+    :return: the path to the PCM file
+    """
+    return os.path.splitext(file_path)[0] + PCM_EXTENSION
+
+
+def save(samples: np.ndarray, path: str):
+    """
+    Atomically save PCM samples, so readers never see a partial file
+
+    :param samples: int16 samples
+    :param path: the path to the PCM file
+    :return: None
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, samples)
+    os.replace(tmp, path)
+
+
+class PcmWriter:
+    """
+    This class appends samples to a PCM file while it is being read.
+    The samples are written before the header is updated with their count,
+    so readers only see samples that have been written.
+    """
+
+    def __init__(self, path: str):
+        """
+        Creates an empty PCM file
+
+        :param path: the path to the PCM file
+        """
+        self.path = path
+        self.samples = 0
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def append(self, samples: np.ndarray):
+        """
+        Append samples to the file
+
+        :param samples: int16 samples
+        :return: None
+        """
+        if len(samples) == 0:
+            return
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(samples.astype("<i2").tobytes())
+        self.samples += len(samples)
+        self._write_header()
+
+    def close(self):
+        """
+        Close the file
+        :return: None
+        """
+        self._file.close()
+
+    def _write_header(self):
+        # the padded header has the same length for any count of samples
+        self._file.seek(0)
+        np.lib.format.write_array_header_1_0(
+            self._file,
+            {"descr": "<i2", "fortran_order": False, "shape": (self.samples,)},
+        )
+        self._file.flush()
+
+
+def _stream_command() -> list[str]:
+    cmd = ["ffmpeg", "-loglevel", "error", "-threads", "0", "-i", "pipe:0"]
+    cmd += ["-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le"]
+    cmd += ["-ar", str(SAMPLE_RATE), "-"]
+    return cmd
+
+
+class StreamDecoder:
+    """
+    This class decodes a recording while it is being received.
+    One ffmpeg process reads the recording from a pipe, so every byte is decoded
+    once, however long the recording grows.
+    """
+
+    def __init__(self):
+        """
+        Starts ffmpeg
+        """
+        self._process = subprocess.Popen(
+            _stream_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._decoded = bytearray()
+        self._errors = bytearray()
+        self._lock = threading.Lock()
+        # both outputs are drained, so ffmpeg never blocks on a full pipe
+        self._readers = [
+            threading.Thread(target=self._drain, args=(stream, buffer), daemon=True)
+            for stream, buffer in (
+                (self._process.stdout, self._decoded),
+                (self._process.stderr, self._errors),
+            )
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def write(self, data: bytes):
+        """
+        Send the next bytes of the recording to ffmpeg
+
+        :param data: the bytes
+        :return: None
+        """
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            # ffmpeg stopped, and close reports why
+            pass
+
+    def read(self) -> np.ndarray:
+        """
+        Take the samples decoded since the last read
+
+        :return: int16 samples
+        """
+        with self._lock:
+            size = len(self._decoded) // 2 * 2
+            data = bytes(self._decoded[:size])
+            del self._decoded[:size]
+        return np.frombuffer(data, np.int16)
+
+    def close(self) -> np.ndarray:
+        """
+        Wait for ffmpeg to decode the rest of the recording
+
+        :return: the int16 samples decoded since the last read
+        """
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._process.wait()
+        for reader in self._readers:
+            reader.join()
+        if self._process.returncode != 0:
+            raise RuntimeError(f"Failed to load audio: {self._errors.decode()}")
+        return self.read()
+
+    def kill(self):
+        """
+        Stop ffmpeg without waiting for the rest of the recording
+        :return: None
+        """
+        self._process.kill()
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._process.wait()
+        for reader in self._readers:
+            reader.join()
+
+    def _drain(self, stream: IO[bytes], buffer: bytearray):
+        for data in iter(lambda: stream.read1(65_536), b""):
+            with self._lock:
+                buffer.extend(data)
+        stream.close()
+
+
+def preprocess(file_path: str) -> tuple[str, float]:
+    """
+    Decode an uploaded recording once and save it as PCM next to the upload.
+
+    :param file_path: the path to the uploaded audio file
+    :return: the path to the PCM file and the duration in seconds
+    """
+    samples = decode(file_path)
+    path = pcm_path(file_path)
+    save(samples, path)
+    return path, len(samples) / SAMPLE_RATE
+
+
+def load(
+    file_path: str, start: Optional[float] = None, end: Optional[float] = None
+) -> np.ndarray:
+    """
+    Load part of an audio file as a 16 kHz mono waveform.
+    PCM files are memory mapped, other files are decoded with ffmpeg.
+
+    :param file_path: the path to a PCM or audio file
+    :param start: the offset in seconds to start from
+    :param end: the offset in seconds to stop at
+    :return: float32 waveform
+    """
+    if is_pcm(file_path):
+        samples = np.load(file_path, mmap_mode="r")
+        first = int((start or 0) * SAMPLE_RATE)
+        last = None if end is None else int(end * SAMPLE_RATE)
+        samples = samples[first:last]
+    else:
+        samples = decode(file_path, start, end)
+
+    return samples.astype(np.float32) / 32768.0
+
+
+def duration(file_path: str) -> Optional[float]:
+    """
+    Read the duration of a PCM file from its header or of an audio file with ffprobe
+
+    :param file_path: the path to a PCM or audio file
+    :return: the duration in seconds or None if it could not be read
+    """
+    if is_pcm(file_path):
+        try:
+            return len(np.load(file_path, mmap_mode="r")) / SAMPLE_RATE
+        except (OSError, ValueError) as err:
+            logging.debug(f"could not read audio duration: {err}")
+            return None
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        file_path,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True, text=True).stdout
+        return float(out.strip())
+    except (OSError, ValueError, subprocess.CalledProcessError) as err:
+        logging.debug(f"could not read audio duration: {err}")
+        return None
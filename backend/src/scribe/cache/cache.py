@@ -0,0 +1,278 @@
+"""
+This module provides caches for expensive results, such as transcriptions.
+
+Values are stored in a small in-memory LRU tier backed by a larger
+on-disk tier that survives restarts and is evicted by total size.
+Values must be JSON serializable.
+
+Concurrent misses for the same key can share a single computation
+through SingleFlight.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def digest(*parts: str) -> str:
+    """
+    Build a cache key from its parts
+
+    :param parts: the strings identifying a value
+    :return: hex encoded sha256 hash
+    """
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part.encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Hash the content of a file
+
+    :param file_path: the path to the file
+    :return: hex encoded sha256 hash
+    """
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class LRUCache:
+    """
+    This class keeps the most recently used values in memory.
+    """
+
+    def __init__(self, max_items: int):
+        """
+        Initializes the cache
+
+        :param max_items: the number of values to keep
+        """
+        self.max_items = max_items
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value from the cache
+
+        :param key: the cache key
+        :return: the cached value or None
+        """
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value, evicting the least recently used values if full.
+
+        :param key: the cache key
+        :param value: the value to store
+        :return: None
+        """
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+class DiskCache:
+    """
+    This class stores values as JSON files in a folder.
+    When the folder grows past its size limit,
+    the least recently used files are removed.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Initializes the cache
+
+        :param path: the folder to store values in
+        :param max_bytes: the total size allowed for the stored values
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _file(self, key: str) -> Path:
+        return self.path.joinpath(key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value from the cache
+
+        :param key: the cache key
+        :return: the cached value or None
+        """
+        file = self._file(key)
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # the modified time doubles as the last access time for eviction
+            os.utime(file)
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            logging.warning(f"could not read cache file {file}: {err}")
+            return None
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value, evicting the least recently used values if full.
+
+        :param key: the cache key
+        :param value: the value to store
+        :return: None
+        """
+        file = self._file(key)
+        data = json.dumps(value).encode("utf-8")
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = file.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+            old_size = file.stat().st_size if file.exists() else 0
+            os.replace(tmp, file)
+        except OSError as err:
+            logging.warning(f"could not write cache file {file}: {err}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> int:
+        return sum(f.stat().st_size for f in self.path.glob("*/*.json"))
+
+    def _evict(self):
+        """
+        Remove the least recently used files until the cache is 90% full.
+        :return: None
+        """
+        files = []
+        for f in self.path.glob("*/*.json"):
+            try:
+                stat = f.stat()
+                files.append((stat.st_mtime, stat.st_size, f))
+            except FileNotFoundError:
+                pass
+
+        size = sum(s for _, s, _ in files)
+        for _, file_size, f in sorted(files):
+            if size <= self.max_bytes * 0.9:
+                break
+            try:
+                f.unlink()
+                size -= file_size
+            except FileNotFoundError:
+                pass
+        self._size = size
+
+
+class TieredCache:
+    """
+    This class combines an in-memory LRU tier with an on-disk tier
+    and counts cache hits and misses.
+    """
+
+    def __init__(self, max_items: int, path: str, max_bytes: int):
+        """
+        Initializes the cache
+
+        :param max_items: the number of values to keep in memory
+        :param path: the folder to store values in
+        :param max_bytes: the total size allowed for the values on disk
+        """
+        self.memory = LRUCache(max_items)
+        self.disk = DiskCache(path, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value from memory, falling back on disk.
+
+        :param key: the cache key
+        :return: the cached value or None
+        """
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value in memory and on disk
+
+        :param key: the cache key
+        :param value: the value to store
+        :return: None
+        """
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+
+class SingleFlight:
+    """
+    This class runs one call at a time per key.
+    Callers asking for a key while its call is in flight wait for
+    the same result instead of starting another call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """
+        The number of calls running
+        """
+        return len(self._calls)
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a call, or join the call already running for the key.
+
+        :param key: identifies the result of the call
+        :param call: the coroutine function computing the result
+        :return: the result of the call, or the exception it raised
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._done(key, done))
+
+        # a caller that gives up does not cancel the call for the others
+        return await asyncio.shield(future)
+
+    def _done(self, key: str, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # the exception is retrieved even if every caller gave up
+        if not future.cancelled():
+            future.exception()
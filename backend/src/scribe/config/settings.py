@@ -3,7 +3,7 @@ The settings module creates a base class of application settings.
 Environment variables are read into these settings, falling back on defaults
 where properties are not specified.
 """
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -29,8 +29,30 @@ class Settings(BaseSettings):
         this is used to share sessions with ngrok for oAuth logins.
     DEEPL_API_KEY: str
         The api key for translating text with DeepL.
+    DEEPL_SERVER_URL: str
+        The DeepL API address, chosen from the api key when empty
+    DEEPL_TIMEOUT_SECONDS: float
+        The time allowed for each step of a DeepL request
+    DEEPL_MAX_CONNECTIONS: int
+        The number of DeepL requests sent at once over pooled connections
+    DEEPL_REQUESTS_PER_SECOND: float
+        The sustained rate of DeepL requests
+    DEEPL_CHARACTERS_PER_MINUTE: int
+        The sustained rate of characters sent to DeepL
+    DEEPL_MAX_RETRIES: int
+        How often a throttled DeepL request is sent again
     PSEUDO_TRANSLATE: bool
         Flag to use mock translations instead of DeepL.
+    TRANSLATION_BACKEND: str
+        The translation backend: deepl | marian
+    TRANSLATION_BACKENDS: dict[str, str]
+        The translation backend by target language, overriding TRANSLATION_BACKEND
+    MARIAN_MODELS: dict[str, str]
+        The Marian model by target language, instead of Helsinki-NLP/opus-mt-en-{lang}
+    MARIAN_BATCH_SIZE: int
+        The number of texts a Marian model translates together
+    TRANSLATION_TIMEOUT_SECONDS: float
+        The time allowed for each translation when publishing
     SLACK_AUTH_URL: str
         The Slack authorization URL.
     SLACK_TEAM_ID: str
@@ -47,6 +69,8 @@ class Settings(BaseSettings):
         User scopes to request from Slack
     UPLOAD_PATH: str
         folder path for file uploads
+    MAX_UPLOAD_BYTES: int
+        The largest request body accepted, which bounds the size of audio uploads
     SOURCE_LANGUAGE: str
         language code for the source language
     TARGET_LANGUAGES: List[str]
@@ -54,6 +78,67 @@ class Settings(BaseSettings):
     SLACK_CHANNEL_LANGUAGE_MAP: dict[str, str]
         map of language codes and the Slack channel id
         for where to send messages in that language
+    SLACK_DIRECTORY_TTL_SECONDS: float
+        How long the workspace users are used before being refreshed
+    SLACK_DIRECTORY_PERSIST: bool
+        Flag to keep the workspace users and channels under UPLOAD_PATH across restarts
+    SLACK_DIRECTORY_MAX_BYTES: int
+        The disk space allowed for the stored workspace directory
+    TRANSCRIPTION_ENGINE: str
+        The speech to text engine: whisper | faster-whisper
+    TRANSCRIPTION_COMPUTE_TYPE: str
+        The weight quantization of the faster-whisper engine: int8 | float16 | float32
+    WHISPER_PROFILES: dict[str, str]
+        map of transcription profiles and the whisper model they use
+    WHISPER_DEFAULT_PROFILE: str
+        the profile used when a recording does not choose one
+    WHISPER_MEMORY_BUDGET_MB: int
+        the memory each transcription worker may use for loaded models.
+        The least recently used models are unloaded to stay within it.
+    TRANSCRIPTION_EXECUTOR: str
+        The worker pool used for transcription: process | thread
+    TRANSCRIPTION_WORKERS: int
+        The number of transcription workers
+    TRANSCRIPTION_SOCKET: str
+        Path of the Unix socket of a standalone transcription service.
+        When set, transcription jobs are sent to the service
+        instead of loading a model in the web workers.
+    TRANSCRIPTION_SOCKET_TIMEOUT_SECONDS: float
+        The longest wait for the transcription service to answer a request
+    TRANSCRIPTION_WARM_UP: bool
+        Flag to load the whisper model in the background at startup
+        instead of on the first transcription
+    TRANSCRIPTION_MAX_JOBS: int
+        The number of transcription jobs allowed to run at once
+    TRANSCRIPTION_QUEUE_POLICY: str
+        The order queued jobs are started in: fifo | shortest (audio duration)
+    TRANSCRIPTION_REALTIME_FACTOR: float
+        Initial estimate of processing seconds per second of audio,
+        used for queue wait estimates
+    TRANSCRIPTION_RETAINED_JOBS: int
+        The number of completed transcription jobs kept for reconnecting clients
+    TRANSCRIPTION_ABANDON_SECONDS: float
+        Time a transcription job may go unwatched before it is cancelled
+    TRANSCRIPTION_STREAMING: bool
+        Flag to transcribe in windows and send each segment as it is ready
+    TRANSCRIPTION_STREAM_WINDOW_SECONDS: int
+        The length of the audio windows transcribed in streaming mode
+    TRANSCRIPTION_LIVE_WINDOW_SECONDS: int
+        The length of the windows transcribed while a recording is still in progress
+    TRANSCRIPTION_LONG_AUDIO_SECONDS: int
+        Recordings at least this long are transcribed in parallel chunks
+    TRANSCRIPTION_CHUNK_SECONDS: int
+        The target length of the chunks of long recordings
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS: float
+        How far neighbouring chunks of long recordings overlap
+    TRANSCRIPTION_CACHE_ITEMS: int
+        The number of transcriptions cached in memory
+    TRANSCRIPTION_CACHE_MAX_BYTES: int
+        The disk space allowed for cached transcriptions under UPLOAD_PATH
+    TRANSLATION_CACHE_ITEMS: int
+        The number of translations cached in memory
+    TRANSLATION_CACHE_MAX_BYTES: int
+        The disk space allowed for cached translations under UPLOAD_PATH
     """
 
     LOG_LEVEL: str = "DEBUG"
@@ -63,7 +148,18 @@ class Settings(BaseSettings):
     DEVELOPMENT_MODE: bool = False
     DEV_SESSION_ID: str = "867-5309"
     DEEPL_API_KEY: str = "your-deepl-api-key"
+    DEEPL_SERVER_URL: str = ""
+    DEEPL_TIMEOUT_SECONDS: float = 10
+    DEEPL_MAX_CONNECTIONS: int = 8
+    DEEPL_REQUESTS_PER_SECOND: float = 5
+    DEEPL_CHARACTERS_PER_MINUTE: int = 100_000
+    DEEPL_MAX_RETRIES: int = 4
     PSEUDO_TRANSLATE: bool = False
+    TRANSLATION_BACKEND: str = "deepl"
+    TRANSLATION_BACKENDS: dict[str, str] = {}
+    MARIAN_MODELS: dict[str, str] = {}
+    MARIAN_BATCH_SIZE: int = 16
+    TRANSLATION_TIMEOUT_SECONDS: float = 30
     SLACK_OPENID_URL: str = "https://slack.com/openid/connect/authorize"
     SLACK_AUTH_URL: str = "https://slack.com/oauth/v2/authorize"
     SLACK_TEAM_ID: str = "your-team-id"
@@ -86,6 +182,7 @@ class Settings(BaseSettings):
         "users:read",
     ]
     UPLOAD_PATH: str = "/tmp/scribe"
+    MAX_UPLOAD_BYTES: int = 100_000_000
     SOURCE_LANGUAGE: str = "en"
     TARGET_LANGUAGES: list[str] = ["es", "fr", "it", "ru", "pt"]
     LANGUAGE_GREETINGS: dict[str, str] = {
@@ -97,6 +194,34 @@ class Settings(BaseSettings):
         "pt": "Caro",
     }
     SLACK_CHANNEL_LANGUAGE_MAP: dict[str, str] = {}
+    SLACK_DIRECTORY_TTL_SECONDS: float = 3_600
+    SLACK_DIRECTORY_PERSIST: bool = False
+    SLACK_DIRECTORY_MAX_BYTES: int = 50_000_000
+    TRANSCRIPTION_ENGINE: Literal["whisper", "faster-whisper"] = "whisper"
+    TRANSCRIPTION_COMPUTE_TYPE: str = "int8"
+    WHISPER_PROFILES: dict[str, str] = {"fast": "tiny", "accurate": "base"}
+    WHISPER_DEFAULT_PROFILE: str = "accurate"
+    WHISPER_MEMORY_BUDGET_MB: int = 1_024
+    TRANSCRIPTION_EXECUTOR: Literal["process", "thread"] = "process"
+    TRANSCRIPTION_WORKERS: int = 2
+    TRANSCRIPTION_SOCKET: Optional[str] = None
+    TRANSCRIPTION_SOCKET_TIMEOUT_SECONDS: float = 1_800
+    TRANSCRIPTION_WARM_UP: bool = True
+    TRANSCRIPTION_MAX_JOBS: int = 2
+    TRANSCRIPTION_QUEUE_POLICY: Literal["fifo", "shortest"] = "fifo"
+    TRANSCRIPTION_REALTIME_FACTOR: float = 0.5
+    TRANSCRIPTION_RETAINED_JOBS: int = 100
+    TRANSCRIPTION_ABANDON_SECONDS: float = 30
+    TRANSCRIPTION_STREAMING: bool = True
+    TRANSCRIPTION_STREAM_WINDOW_SECONDS: int = 30
+    TRANSCRIPTION_LIVE_WINDOW_SECONDS: int = 10
+    TRANSCRIPTION_LONG_AUDIO_SECONDS: int = 600
+    TRANSCRIPTION_CHUNK_SECONDS: int = 120
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS: float = 2.0
+    TRANSCRIPTION_CACHE_ITEMS: int = 256
+    TRANSCRIPTION_CACHE_MAX_BYTES: int = 50_000_000
+    TRANSLATION_CACHE_ITEMS: int = 1024
+    TRANSLATION_CACHE_MAX_BYTES: int = 20_000_000
 
     class Config:
         env_prefix = "SCRIBE_"
@@ -6,20 +6,21 @@ import logging
 from typing import Annotated, List
 
 from fastapi import Depends
-from starlette.requests import Request
+from starlette.requests import HTTPConnection
 
 from scribe.exceptions import NotAuthenticatedException
 from scribe.models.models import Channel, Notification, User
 from scribe.session.session import Session, SessionStore
+from scribe.slack import directory
 from scribe.slack.slack import SlackClient
 
 session_store = SessionStore()
 
 
-def get_session(request: Request) -> Session:
+def get_session(request: HTTPConnection) -> Session:
     """
     Retrieve the active Session
-    :param request: The HTTP request
+    :param request: The HTTP request or WebSocket
     :return: Session object
     """
     session = None
@@ -62,11 +63,12 @@ def session_channels(
     :param session: The active session
     :return: a list of Channel objects
     """
-    channels = session.get("channels")
-    if channels is None:
+    channel_ids = session.get("channel_ids")
+    if channel_ids is None:
         raise NotAuthenticatedException("Not authenticated")
 
-    return channels
+    direct_messages = session.get("direct_messages") or {}
+    return directory.workspace_directory().resolve(channel_ids, direct_messages)
 
 
 def slack_client(session: Annotated[Session, Depends(get_session)]) -> SlackClient:
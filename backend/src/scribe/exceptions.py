@@ -9,3 +9,19 @@ class NotAuthenticatedException(Exception):
     """
 
     pass
+
+
+class InvalidAudioException(Exception):
+    """
+    This exception indicates that an uploaded file is not a supported audio format
+    """
+
+    pass
+
+
+class UploadTooLargeException(Exception):
+    """
+    This exception indicates that an upload exceeds the allowed size
+    """
+
+    pass
@@ -4,6 +4,7 @@ This is the main entry point for the scribe.
 This initializes configuration settings and creates the FastAPI instance.
 """
 
+import asyncio
 import logging
 
 from fastapi import FastAPI, HTTPException, Request
@@ -16,7 +17,10 @@ from scribe import config
 from scribe.config.settings import settings
 from scribe.dependencies import get_session
 from scribe.exceptions import NotAuthenticatedException
-from scribe.routers import pages
+from scribe.routers import api, pages
+from scribe.slack import slack
+from scribe.text import executor, text
+from scribe.uploads.uploads import MaxBodySizeMiddleware
 
 config.init()
 logging.info(f"starting the server on port {settings.PORT}...")
@@ -28,8 +32,33 @@ app.add_middleware(
     secret_key=settings.SESSION_KEY,
     session_cookie="scribe_session_id",
 )
+app.add_middleware(MaxBodySizeMiddleware, max_bytes=settings.MAX_UPLOAD_BYTES)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(pages.router)
+app.include_router(api.router)
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Load the transcription models in the background,
+    so the server accepts requests while they load.
+    :return: None
+    """
+    if settings.TRANSCRIPTION_WARM_UP:
+        app.state.warm_up = asyncio.create_task(text.warm_up())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Release the transcription workers, translation and Slack connections
+    when the server stops.
+    :return: None
+    """
+    executor.shutdown()
+    await text.close_translator()
+    await slack.close()
 
 
 @app.middleware("http")
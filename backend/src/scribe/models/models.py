@@ -67,10 +67,13 @@ class Channel(BaseModel):
             The id of the channel
         name : str
             The name of the channel
+        user_id : str
+            The other user of a direct message, None for other channels
     """
 
     id: str
     name: str
+    user_id: Optional[str] = None
 
 
 class Recording(BaseModel):
@@ -85,11 +88,82 @@ class Recording(BaseModel):
             The file location
         transcription : str
             The text transcription of the audio
+        profile : str
+            The transcription profile, such as fast or accurate
+        pcm_path : str
+            The location of the audio decoded to 16 kHz PCM
+        duration : float
+            The length of the audio in seconds
+        audio_hash : str
+            The sha256 hash of the uploaded audio
     """
 
     id: str
     file_path: str
     transcription: Optional[str] = None
+    profile: Optional[str] = None
+    pcm_path: Optional[str] = None
+    duration: Optional[float] = None
+    audio_hash: Optional[str] = None
+
+
+class TranscriptionEventType(str, Enum):
+    queued = "queued"
+    started = "started"
+    segment = "segment"
+    complete = "complete"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class TranscriptionEvent(BaseModel):
+    """
+    The TranscriptionEvent class represents a progress update of a transcription job
+
+    Attributes
+    ----------
+        type : TranscriptionEventType
+            The kind of update
+        position : int
+            The position of the job in the queue, starting at 1
+        estimated_start : float
+            The estimated number of seconds until the job starts
+        text : str
+            The transcribed text, or a part of it for segment events
+        error : str
+            The reason the job failed
+    """
+
+    type: TranscriptionEventType
+    position: Optional[int] = None
+    estimated_start: Optional[float] = None
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TranslationUsage(BaseModel):
+    """
+    The TranslationUsage class represents the translation quota of the DeepL account
+
+    Attributes
+    ----------
+        character_count : int
+            The characters translated in the current billing period
+        character_limit : int
+            The characters allowed in the current billing period
+        characters_sent : int
+            The characters this server sent to DeepL since it started
+        cache_hits : int
+            The paragraphs answered from the translation cache
+        cache_misses : int
+            The paragraphs that had to be translated
+    """
+
+    character_count: int
+    character_limit: Optional[int] = None
+    characters_sent: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
 
 
 class NotificationType(str, Enum):
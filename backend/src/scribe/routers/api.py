@@ -0,0 +1,32 @@
+"""
+This module contains the JSON routes used to operate the app.
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from starlette import status
+
+from scribe.dependencies import session_user
+from scribe.models.models import TranslationUsage, User
+from scribe.text import text
+from scribe.text.text import TranslationException
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/translation/usage")
+async def translation_usage(
+    _user: Annotated[User, Depends(session_user)]
+) -> TranslationUsage:
+    """
+    Report the DeepL character quota and the translation cache activity.
+
+    :param _user: active session user
+    :return: TranslationUsage
+    """
+    try:
+        return await text.translation_usage()
+    except TranslationException as err:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail=str(err)
+        ) from err
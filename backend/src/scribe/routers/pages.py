@@ -1,20 +1,35 @@
 """
 This module contains all the HTML based routes for the app.
 """
+import asyncio
 import datetime
+import html
 import logging
 import os
 import secrets
+from contextlib import aclosing
 from pathlib import Path
 from typing import Annotated, List, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+)
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sse_starlette.sse import EventSourceResponse
-from starlette.responses import RedirectResponse
+from starlette import status
+from starlette.responses import RedirectResponse, Response
 
+from scribe.audio import audio
 from scribe.config.settings import settings
 from scribe.dependencies import (
     consume_notifications,
@@ -23,18 +38,22 @@ from scribe.dependencies import (
     session_user,
     slack_client,
 )
+from scribe.exceptions import InvalidAudioException, UploadTooLargeException
 from scribe.models.models import (
     Channel,
     Notification,
     NotificationType,
     Recording,
+    TranscriptionEventType,
     User,
 )
 from scribe.session.session import Session
-from scribe.slack import slack
+from scribe.slack import directory, slack
 from scribe.slack.slack import SlackClient, SlackError
-from scribe.text import text
+from scribe.text import live, text
+from scribe.text.scheduler import TranscriptionJob
 from scribe.text.text import TranslationException
+from scribe.uploads import uploads
 
 # initialize the frontend router
 router = APIRouter()
@@ -42,6 +61,8 @@ router = APIRouter()
 # configure the template engine
 _templates = Jinja2Templates(directory="templates")
 _templates.env.globals["now"] = datetime.datetime.utcnow()
+_templates.env.globals["whisper_profiles"] = list(settings.WHISPER_PROFILES)
+_templates.env.globals["default_profile"] = settings.WHISPER_DEFAULT_PROFILE
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -150,14 +171,25 @@ async def read_code(
         return RedirectResponse("/login")
 
     try:
-        access_token = slack.access_token(code)
-        client = slack.SlackClient(access_token)
-        # todo make calls asynchronously
-        user = client.user()
+        access_token = await asyncio.to_thread(slack.access_token, code)
+        client = slack.AsyncSlackClient(access_token)
+        user, team, channels = await asyncio.gather(
+            client.user(),
+            client.team(),
+            directory.workspace_directory().channels(client),
+        )
         session.set("access_token", access_token)
         session.set("user", user)
-        session.set("team", client.team())
-        session.set("channels", client.channels())
+        session.set("team", team)
+        # channel names are shared by every session in the workspace directory,
+        # direct messages are named after the other user of the session
+        session.set(
+            "channel_ids", [channel.id for channel in channels if not channel.user_id]
+        )
+        session.set(
+            "direct_messages",
+            {channel.id: channel.user_id for channel in channels if channel.user_id},
+        )
 
         session.append(
             "notifications",
@@ -203,92 +235,150 @@ async def read_code(
         session.delete("nonce")
 
 
+def _languages() -> List[dict]:
+    """
+    The languages a transcription can be published in
+    :return: a list of language dicts with flags and default channels
+    """
+    return [
+        {
+            "language_code": "en",
+            "country_code": "us",
+            "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get("en", None),
+        },
+        {
+            "language_code": "es",
+            "country_code": "es",
+            "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get("es", None),
+        },
+        {
+            "language_code": "fr",
+            "country_code": "fr",
+            "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get("fr", None),
+        },
+        {
+            "language_code": "it",
+            "country_code": "it",
+            "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get("it", None),
+        },
+        {
+            "language_code": "pt",
+            "country_code": "br",
+            "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get("pt", None),
+        },
+        {
+            "language_code": "ru",
+            "country_code": "ru",
+            "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get("ru", None),
+        },
+    ]
+
+
+async def submit_transcription(recording: Recording) -> TranscriptionJob:
+    """
+    Queue a recording for transcription, using the recording id as the job id.
+    A job that is already queued, running or completed is reused.
+
+    :param recording: The audio recording to transcribe
+    :return: TranscriptionJob
+    """
+    return await text.submit_transcription(
+        recording.id,
+        recording.pcm_path or recording.file_path,
+        recording.profile,
+        recording.duration,
+        recording.audio_hash,
+    )
+
+
+def _resume_index(job: TranscriptionJob, last_event_id: Optional[str]) -> int:
+    """
+    Find where a reconnecting client left off in the events of a job.
+    Event ids are "<run id>:<number of events sent>", so ids from an earlier
+    run of the same recording start the new run from the beginning.
+
+    :param job: the transcription job
+    :param last_event_id: the Last-Event-ID header sent by the browser
+    :return: the number of events to skip
+    """
+    run_id, _, index = (last_event_id or "").partition(":")
+    if run_id != job.run_id or not index.isdigit():
+        return 0
+    return min(int(index), len(job.events))
+
+
 async def transcription_event_generator(
-    request: Request, recording: Recording, channels: List[Channel]
+    request: Request,
+    recording: Recording,
+    channels: List[Channel],
+    last_event_id: Optional[str] = None,
 ):
     """
-    Server Side Event Generator: Transcribes a recording and sends a message when done.
+    Server Side Event Generator: attaches to the transcription job of a recording,
+    reports its progress and sends a message when done.
+    Each message has an id, so a reconnecting browser resumes after the
+    last message it received instead of starting over.
     :param request: The HTTP Request
     :param recording: The audio recording to transcribe
+    :param channels: The channels the user has access to
+    :param last_event_id: the id of the last message the browser received
     :returns: a message dict with a turbo stream for updating the UI
     """
-    while True:
-        if await request.is_disconnected():
-            logging.debug("Request disconnected")
-            break
+    job = await submit_transcription(recording)
+    index = _resume_index(job, last_event_id)
+    # closing the watcher promptly lets the scheduler cancel abandoned jobs
+    async with aclosing(job.watch(index)) as events:
+        async for event in events:
+            index += 1
+            if await request.is_disconnected():
+                logging.debug("Request disconnected")
+                break
+
+            if event.type == TranscriptionEventType.complete:
+                recording.transcription = event.text
+                # the editor wraps the transcription in a paragraph
+                text.pretranslate(
+                    recording.id, f"<p>{html.escape(event.text, False)}</p>"
+                )
+                logging.debug("Transcription completed. Disconnecting now")
+                data = _templates.get_template(
+                    "streams/transcription_complete.html.j2"
+                ).render(
+                    {
+                        "request": request,
+                        "recording": recording,
+                        "languages": _languages(),
+                        "channels": channels,
+                    }
+                )
+            elif event.type in (
+                TranscriptionEventType.failed,
+                TranscriptionEventType.cancelled,
+            ):
+                data = _templates.get_template(
+                    "streams/send_notification.html.j2"
+                ).render(
+                    {
+                        "request": request,
+                        "notification": Notification(
+                            type="error",
+                            title="Error transcribing audio",
+                            message=(
+                                "We're sorry, your recording could not be processed."
+                            ),
+                        ),
+                    }
+                )
+            elif event.type == TranscriptionEventType.segment:
+                data = _templates.get_template(
+                    "streams/transcription_segment.html.j2"
+                ).render({"request": request, "event": event})
+            else:
+                data = _templates.get_template(
+                    "streams/transcription_status.html.j2"
+                ).render({"request": request, "event": event})
 
-        try:
-            languages = [
-                {
-                    "language_code": "en",
-                    "country_code": "us",
-                    "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get(
-                        "en", None
-                    ),
-                },
-                {
-                    "language_code": "es",
-                    "country_code": "es",
-                    "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get(
-                        "es", None
-                    ),
-                },
-                {
-                    "language_code": "fr",
-                    "country_code": "fr",
-                    "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get(
-                        "fr", None
-                    ),
-                },
-                {
-                    "language_code": "it",
-                    "country_code": "it",
-                    "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get(
-                        "it", None
-                    ),
-                },
-                {
-                    "language_code": "pt",
-                    "country_code": "br",
-                    "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get(
-                        "pt", None
-                    ),
-                },
-                {
-                    "language_code": "ru",
-                    "country_code": "ru",
-                    "default_channel": settings.SLACK_CHANNEL_LANGUAGE_MAP.get(
-                        "ru", None
-                    ),
-                },
-            ]
-            recording.transcription = text.transcribe(recording.file_path)
-            logging.debug("Transcription completed. Disconnecting now")
-            data = _templates.get_template(
-                "streams/transcription_complete.html.j2"
-            ).render(
-                {
-                    "request": request,
-                    "recording": recording,
-                    "languages": languages,
-                    "channels": channels,
-                }
-            )
-            yield {"event": "message", "data": data}
-        except RuntimeError as err:
-            logging.warning(f"error transcribing audio: {err}")
-            data = _templates.get_template("streams/send_notification.html.j2").render(
-                {
-                    "request": request,
-                    "notification": Notification(
-                        type="error",
-                        title="Error transcribing audio",
-                        message="We're sorry, your recording could not be processed.",
-                    ),
-                }
-            )
-            yield {"event": "message", "data": data}
-        break
+            yield {"event": "message", "id": f"{job.run_id}:{index}", "data": data}
 
 
 @router.post("/upload")
@@ -297,46 +387,79 @@ async def upload(
     request: Request,
     _user: Annotated[User, Depends(session_user)],
     session: Annotated[Session, Depends(get_session)],
+    profile: Annotated[Optional[str], Form()] = None,
 ):
     """
     upload an audio file
-    :param audio_file: mpeg, ogg, wan, or flac audio file
+    :param audio_file: mpeg, ogg, webm, wav, or flac audio file
     :param request: the HTTP request
     :param _user: logged-in user, used to check user session exists
     :param session: the active Session object
+    :param profile: transcription profile, such as fast or accurate
     :return: HTML Response
     """
-    allowed_mime_types = ["audio/mpeg", "audio/ogg", "audio/wav", "audio/flac"]
-    if audio_file.content_type not in allowed_mime_types:
-        logging.warning(f"invalid content-type: {audio_file.content_type}")
-        return _templates.TemplateResponse(
-            "streams/send_notification.html.j2",
-            {
-                "request": request,
-                "notification": Notification(
-                    type="error",
-                    title="Invalid file type",
-                    message="The wrong type of audio file was submitted.",
-                ),
-            },
-            # Turbo needs post data that returns HTML to set a status of 303 redirect.
-            # This is due to how browsers handle page history with form submissions.
-            status_code=415,
-            headers={"Content-Type": "text/vnd.turbo-stream.html; charset=utf-8"},
-        )
-
     try:
         file_id = uuid4()
         parent_dir = os.path.join(settings.UPLOAD_PATH, session.id)
-        Path(parent_dir).mkdir(parents=True, exist_ok=True)
-        file_path = os.path.join(parent_dir, f"{file_id }.ogg")
+        await asyncio.to_thread(Path(parent_dir).mkdir, parents=True, exist_ok=True)
 
-        file_content = await audio_file.read()
-        # Save the content to the file
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        try:
+            stored = await uploads.save(
+                audio_file, parent_dir, str(file_id), settings.MAX_UPLOAD_BYTES
+            )
+        except InvalidAudioException as err:
+            logging.warning(f"invalid audio file: {err}")
+            return _templates.TemplateResponse(
+                "streams/send_notification.html.j2",
+                {
+                    "request": request,
+                    "notification": Notification(
+                        type="error",
+                        title="Invalid file type",
+                        message="The wrong type of audio file was submitted.",
+                    ),
+                },
+                # Turbo needs post data that returns HTML to set a status of 303
+                # redirect. This is due to how browsers handle page history with
+                # form submissions.
+                status_code=415,
+                headers={"Content-Type": "text/vnd.turbo-stream.html; charset=utf-8"},
+            )
+        except UploadTooLargeException as err:
+            logging.warning(f"audio file too large: {err}")
+            return _templates.TemplateResponse(
+                "streams/send_notification.html.j2",
+                {
+                    "request": request,
+                    "notification": Notification(
+                        type="error",
+                        title="File too large",
+                        message="The audio file submitted is too large.",
+                    ),
+                },
+                status_code=413,
+                headers={"Content-Type": "text/vnd.turbo-stream.html; charset=utf-8"},
+            )
+
+        if profile not in settings.WHISPER_PROFILES:
+            profile = settings.WHISPER_DEFAULT_PROFILE
+
+        recording = Recording(
+            id=str(file_id),
+            file_path=stored.file_path,
+            profile=profile,
+            audio_hash=stored.sha256,
+        )
+        try:
+            recording.pcm_path, recording.duration = await asyncio.to_thread(
+                audio.preprocess, stored.file_path
+            )
+        except Exception as err:
+            # the transcriber can still decode the original file itself
+            logging.warning(f"could not preprocess audio: {err}")
 
-        recording = Recording(id=str(file_id), file_path=file_path)
+        # start transcribing now rather than when the browser subscribes
+        await submit_transcription(recording)
         recordings = session.get("recordings", {})
         recordings[recording.id] = recording
         session.set("recordings", recordings)
@@ -368,6 +491,102 @@ async def upload(
         )
 
 
+@router.websocket("/recordings/live")
+async def live_recording(
+    websocket: WebSocket,
+    session: Annotated[Session, Depends(get_session)],
+    profile: Optional[str] = None,
+):
+    """
+    Receive a recording while it is being recorded and transcribe it as it arrives.
+    The browser sends the recorder's chunks as binary messages and "stop" when
+    recording ends, then receives the turbo stream that shows the recording.
+
+    :param websocket: the WebSocket connection
+    :param session: the active Session object
+    :param profile: transcription profile, such as fast or accurate
+    :return: None
+    """
+    await websocket.accept()
+    if session.get("user") is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    if profile not in settings.WHISPER_PROFILES:
+        profile = settings.WHISPER_DEFAULT_PROFILE
+
+    file_id = str(uuid4())
+    parent_dir = os.path.join(settings.UPLOAD_PATH, session.id)
+    await asyncio.to_thread(Path(parent_dir).mkdir, parents=True, exist_ok=True)
+    recording = live.LiveTranscription(
+        file_id,
+        parent_dir,
+        text.model_name(profile),
+        settings.TRANSCRIPTION_LIVE_WINDOW_SECONDS,
+        settings.MAX_UPLOAD_BYTES,
+    )
+
+    notification = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                logging.debug("live recording disconnected")
+                await recording.abort()
+                return
+            if message.get("bytes"):
+                await recording.append(message["bytes"])
+            elif message.get("text") == "stop":
+                break
+
+        await recording.finish()
+    except InvalidAudioException as err:
+        logging.warning(f"invalid live recording: {err}")
+        notification = Notification(
+            type="error",
+            title="Invalid file type",
+            message="The wrong type of audio file was submitted.",
+        )
+    except UploadTooLargeException as err:
+        logging.warning(f"live recording too large: {err}")
+        notification = Notification(
+            type="error",
+            title="File too large",
+            message="The audio file submitted is too large.",
+        )
+    except Exception as err:
+        logging.warning(f"Failed to transcribe live recording: {err}")
+        notification = Notification(
+            type="error",
+            title="Error processing recording",
+            message="An error occurred while uploading your recording.",
+        )
+
+    if notification is not None:
+        await recording.abort()
+        data = _templates.get_template("streams/send_notification.html.j2").render(
+            {"request": websocket, "notification": notification}
+        )
+    else:
+        saved = Recording(
+            id=file_id,
+            file_path=recording.file_path,
+            profile=profile,
+            pcm_path=recording.pcm_path,
+            duration=recording.duration,
+            audio_hash=recording.audio_hash,
+        )
+        recordings = session.get("recordings", {})
+        recordings[saved.id] = saved
+        session.set("recordings", recordings)
+        data = _templates.get_template("streams/upload_audio.html.j2").render(
+            {"request": websocket, "recording": saved}
+        )
+
+    await websocket.send_text(data)
+    await websocket.close()
+
+
 @router.get("/recordings/{recording_id}")
 async def transcribe_recording(
     request: Request,
@@ -375,6 +594,7 @@ async def transcribe_recording(
     _user: Annotated[User, Depends(session_user)],
     channels: Annotated[List[Channel], Depends(session_channels)],
     session: Annotated[Session, Depends(get_session)],
+    last_event_id: Annotated[Optional[str], Header()] = None,
 ):
     """
     Transcribe an audio recording
@@ -384,6 +604,7 @@ async def transcribe_recording(
     :param _user: active session user
     :param channels: The channels the user has access to
     :param session: active Session object
+    :param last_event_id: the id of the last event received before reconnecting
     :return: SSE EventSourceResponse
     """
     recordings = session.get("recordings", {})
@@ -405,7 +626,9 @@ async def transcribe_recording(
             headers={"Content-Type": "text/vnd.turbo-stream.html; charset=utf-8"},
         )
 
-    event_generator = transcription_event_generator(request, recording, channels)
+    event_generator = transcription_event_generator(
+        request, recording, channels, last_event_id
+    )
 
     return EventSourceResponse(
         event_generator,
@@ -464,38 +687,22 @@ async def publish(
         message = formatted_message.strip()
         messages = {}
 
-        if en_enabled and en_channel_id != "":
-            messages["en"] = {"message": message, "channel_id": en_channel_id}
-
-        if es_enabled and es_channel_id != "":
-            messages["es"] = {
-                "message": text.translate(message, "es"),
-                "channel_id": es_channel_id,
-            }
-
-        if fr_enabled and fr_channel_id != "":
-            messages["fr"] = {
-                "message": text.translate(message, "fr"),
-                "channel_id": fr_channel_id,
-            }
-
-        if it_enabled and it_channel_id != "":
-            messages["it"] = {
-                "message": text.translate(message, "it"),
-                "channel_id": it_channel_id,
-            }
-
-        if pt_enabled and pt_channel_id != "":
-            messages["pt"] = {
-                "message": text.translate(message, "pt"),
-                "channel_id": pt_channel_id,
-            }
-
-        if ru_enabled and ru_channel_id != "":
-            messages["ru"] = {
-                "message": text.translate(message, "ru"),
-                "channel_id": ru_channel_id,
-            }
+        channels = {
+            "en": en_channel_id if en_enabled else "",
+            "es": es_channel_id if es_enabled else "",
+            "fr": fr_channel_id if fr_enabled else "",
+            "it": it_channel_id if it_enabled else "",
+            "pt": pt_channel_id if pt_enabled else "",
+            "ru": ru_channel_id if ru_enabled else "",
+        }
+        channels = {lang: channel for lang, channel in channels.items() if channel}
+
+        translations = await text.translate_all(
+            message, [lang for lang in channels if lang != "en"]
+        )
+        translations["en"] = message
+        for lang, channel_id in channels.items():
+            messages[lang] = {"message": translations[lang], "channel_id": channel_id}
 
         if messages == {}:
             return _templates.TemplateResponse(
@@ -582,6 +789,25 @@ async def publish(
         )
 
 
+@router.post("/pretranslate", status_code=202)
+async def pretranslate(
+    formatted_message: Annotated[str, Form()],
+    _user: Annotated[User, Depends(session_user)],
+    session: Annotated[Session, Depends(get_session)],
+):
+    """
+    Start translating a message while it is being edited,
+    so publishing finds the translations ready.
+
+    :param formatted_message: message formatted as HTML
+    :param _user: active session user
+    :param session: the active session
+    :return: empty Response
+    """
+    text.pretranslate(session.id, formatted_message.strip())
+    return Response(status_code=202)
+
+
 @router.get("/notify")
 def notify(
     request: Request,
@@ -0,0 +1,194 @@
+"""
+This module keeps a process-wide directory of the Slack workspace.
+
+Naming direct messages needs every member of the workspace, which takes a
+paginated users_list call per login. The directory loads the members once
+and shares them between logins. Once they are older than the time to live,
+they are still served while a login refreshes them in the background.
+Channel names are kept here too, so sessions only hold the ids of the
+channels their user can see. Both users of a direct message share its id,
+so direct messages are not kept here. Sessions hold the other user of each
+of their direct messages, and it is named after that user.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from scribe.cache.cache import DiskCache, SingleFlight
+from scribe.config.settings import settings
+from scribe.models.models import Channel, User
+from scribe.slack.slack import AsyncSlackClient, conversation_channels
+
+_directory: Optional["WorkspaceDirectory"] = None
+
+
+class WorkspaceDirectory:
+    """
+    This class caches the users and channels of the workspace.
+    """
+
+    def __init__(self, ttl: float, store: Optional[DiskCache] = None):
+        """
+        Initializes the directory
+
+        :param ttl: the seconds after which the users are refreshed
+        :param store: keeps the directory across restarts, if given
+        """
+        self.ttl = ttl
+        self._store = store
+        self._loaded = store is None
+        self._users: Optional[Dict[str, User]] = None
+        self._refreshed = 0.0
+        self._channels: Dict[str, Channel] = {}
+        self._refreshes = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+        self._writes = asyncio.Lock()
+
+    @property
+    def stale(self) -> bool:
+        """
+        Whether the users are older than the time to live
+        """
+        return time.time() - self._refreshed > self.ttl
+
+    async def users(self, client: AsyncSlackClient) -> Dict[str, User]:
+        """
+        Retrieve the users of the workspace.
+        Only the first call waits for Slack,
+        stale users are refreshed in the background.
+
+        :param client: a client of a logged in user, used to refresh the users
+        :return: users by id
+        """
+        if not self._loaded:
+            self._apply(*await asyncio.to_thread(self._read))
+
+        if self._users is None:
+            return await self._refresh(client)
+
+        if self.stale:
+            self.refresh_in_background(client)
+        return self._users
+
+    async def channels(self, client: AsyncSlackClient) -> List[Channel]:
+        """
+        Retrieve the channels visible to a user and remember their names.
+
+        :param client: the client of the user
+        :return: the channels sorted by name
+        """
+        users, conversations = await asyncio.gather(
+            self.users(client), client.conversations()
+        )
+        channels = conversation_channels(conversations, users)
+        self._channels.update(
+            (channel.id, channel) for channel in channels if channel.user_id is None
+        )
+        if self._store is not None:
+            # the channels are copied on the event loop, so concurrent logins
+            # never change them while they are copied, and the writes are in
+            # order, so the last one holds every channel
+            async with self._writes:
+                await asyncio.to_thread(self._store.set, "channels", self._stored())
+        return channels
+
+    def _stored(self) -> dict:
+        return {id: c.model_dump() for id, c in self._channels.items()}
+
+    def resolve(
+        self, channel_ids: List[str], direct_messages: Dict[str, str]
+    ) -> List[Channel]:
+        """
+        Look up the channels of a user, leaving out unknown channels and users.
+
+        :param channel_ids: the ids of the channels that are not direct messages
+        :param direct_messages: the other user of each direct message, by its id
+        :return: the channels sorted by name
+        """
+        if not self._loaded:
+            self._apply(*self._read())
+        channels = [self._channels[id] for id in channel_ids if id in self._channels]
+        users = self._users or {}
+        channels += [
+            Channel(id=id, name=users[user_id].display_name, user_id=user_id)
+            for id, user_id in direct_messages.items()
+            if user_id in users
+        ]
+        return sorted(channels, key=lambda x: x.name.lower())
+
+    def refresh_in_background(self, client: AsyncSlackClient):
+        """
+        Refresh the users without waiting for Slack.
+
+        :param client: a client of a logged in user
+        :return: None
+        """
+        task = asyncio.create_task(self._refresh(client))
+        self._tasks.add(task)
+        task.add_done_callback(self._refreshed_in_background)
+
+    def _refreshed_in_background(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"could not refresh Slack users: {task.exception()}")
+
+    async def _refresh(self, client: AsyncSlackClient) -> Dict[str, User]:
+        # logins at the same time share one refresh
+        return await self._refreshes.do("users", lambda: self._load_users(client))
+
+    async def _load_users(self, client: AsyncSlackClient) -> Dict[str, User]:
+        users = await client.users()
+        self._users = users
+        self._refreshed = time.time()
+        logging.info(f"loaded {len(users)} Slack users")
+        if self._store is not None:
+            data = {
+                "refreshed": self._refreshed,
+                "users": {id: user.model_dump() for id, user in users.items()},
+            }
+            await asyncio.to_thread(self._store.set, "users", data)
+        return users
+
+    def _read(self) -> Tuple[Optional[dict], dict]:
+        """
+        Read the directory stored by a previous process.
+        :return: (the stored users or None, the stored channels)
+        """
+        return self._store.get("users"), self._store.get("channels") or {}
+
+    def _apply(self, users: Optional[dict], channels: dict):
+        """
+        Add a stored directory, unless another call already has.
+
+        :param users: the stored users or None
+        :param channels: the stored channels
+        :return: None
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        if users is not None:
+            self._users = {id: User(**u) for id, u in users["users"].items()}
+            self._refreshed = users["refreshed"]
+        for id, channel in channels.items():
+            self._channels.setdefault(id, Channel(**channel))
+
+
+def workspace_directory() -> WorkspaceDirectory:
+    """
+    Retrieve the workspace directory, creating it on first use.
+
+    :return: WorkspaceDirectory
+    """
+    global _directory
+    if _directory is None:
+        store = None
+        if settings.SLACK_DIRECTORY_PERSIST:
+            store = DiskCache(
+                os.path.join(settings.UPLOAD_PATH, "cache", "slack"),
+                settings.SLACK_DIRECTORY_MAX_BYTES,
+            )
+        _directory = WorkspaceDirectory(settings.SLACK_DIRECTORY_TTL_SECONDS, store)
+    return _directory
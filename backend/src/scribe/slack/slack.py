@@ -1,25 +1,31 @@
 """
 This module manages API calls to Slack
 """
+import asyncio
 import logging
 import re
 from typing import Dict, List, Optional, Tuple
 
 import slack_sdk
 from fastapi import UploadFile
-from slack_bolt import App
 from slack_sdk.errors import SlackApiError
 
 from scribe.config.settings import settings
 from scribe.models.models import Channel, Team, User
 
 __slack = None
+__http_session = None
+# the pooled connections of the session belong to the event loop that opened them
+__http_session_loop = None
 redirect_uri = f"{ settings.SITE_URL }/auth/redirect"
 
 
-def __slack_app() -> App:
+def __slack_app():
     global __slack
     if __slack is None:
+        # slack_bolt is slow to import and only needed for logins
+        from slack_bolt import App
+
         __slack = App(
             token=settings.SLACK_USER_TOKEN,
             signing_secret=settings.SLACK_SIGNING_SECRET,
@@ -89,19 +95,7 @@ class SlackClient:
             if not profile_res.get("ok", False):
                 raise SlackError(profile_res.get("error"))
 
-            profile = profile_res.get("profile", {})
-            return User(
-                id=user_id,
-                real_name=profile.get("real_name", ""),
-                real_name_normalized=profile.get("real_name_normalized", ""),
-                first_name=profile.get("first_name", ""),
-                last_name=profile.get("last_name", ""),
-                display_name=profile.get(
-                    "display_name",
-                    profile.get("first_name", ""),
-                ),
-                image=profile.get("image_48", ""),
-            )
+            return _profile_user(user_id, profile_res.get("profile", {}))
 
         except SlackApiError:
             raise SlackError("invalid token")
@@ -115,12 +109,7 @@ class SlackClient:
         info = self.client.team_info()
         if not info.get("ok", False):
             raise SlackError(info.get("error"))
-        team_id = info.get("team", {}).get("id", "")
-        return Team(
-            id=team_id,
-            name=info.get("team", {}).get("name", ""),
-            image=info.get("team", {}).get("icon", {}).get("image_68", ""),
-        )
+        return _team(info.get("team", {}))
 
     def users(self) -> dict[str, User]:
         """
@@ -135,31 +124,7 @@ class SlackClient:
             response = self.client.users_list(cursor=next_cursor)
             if not response.get("ok", False):
                 raise SlackError(response.get("error"))
-            users = response.get("members", [])
-            for user in users:
-                if not user.get("is_bot", False):
-                    profile = user.get("profile", {})
-                    display_name = user.get("display_name", "")
-                    if display_name == "":
-                        display_name = (
-                            f"{profile.get('first_name', '')} "
-                            f"{profile.get('last_name', '')}"
-                        ).strip()
-                    if display_name == "":
-                        display_name = profile.get("real_name", "")
-
-                    if display_name != "":
-                        users_list[user.get("id", "")] = User(
-                            id=user.get("id", ""),
-                            real_name=profile.get("real_name", ""),
-                            real_name_normalized=profile.get(
-                                "real_name_normalized", ""
-                            ),
-                            first_name=profile.get("first_name", ""),
-                            last_name=profile.get("last_name", ""),
-                            display_name=display_name,
-                            image=profile.get("image_48", ""),
-                        )
+            users_list.update(_members(response.get("members", [])))
 
             next_cursor = response.get("response_metadata", {}).get("next_cursor", None)
             if not next_cursor:
@@ -185,24 +150,13 @@ class SlackClient:
             )
             if not response.get("ok", False):
                 raise SlackError(response.get("error"))
-            channels = response.get("channels", [])
-            for channel in channels:
-                if channel.get("is_im", False):
-                    user = users.get(channel.get("user"), None)
-                    if user:
-                        channel_list.append(
-                            Channel(id=channel.get("id", ""), name=user.display_name)
-                        )
-                else:
-                    channel_list.append(
-                        Channel(id=channel.get("id", ""), name=channel.get("name", ""))
-                    )
+            channel_list += response.get("channels", [])
 
             next_cursor = response.get("response_metadata", {}).get("next_cursor", None)
             if not next_cursor:
                 break
 
-        return sorted(channel_list, key=lambda x: x.name.lower())
+        return conversation_channels(channel_list, users)
 
     def publish(
         self,
@@ -258,6 +212,221 @@ class SlackClient:
                     logging.warning(f"failed to post message: {response['error']}")
 
 
+class AsyncSlackClient:
+    """
+    Class used to interact with Slack API without blocking the event loop.
+    Every client shares one pool of HTTP connections.
+    """
+
+    def __init__(self, token: str):
+        """
+        Initializes the Slack Client
+
+        :param token: The Slack OAuth access token
+        """
+        # aiohttp is slow to import and only needed for logins
+        from slack_sdk.web.async_client import AsyncWebClient
+
+        self.access_token = token
+        self.client = AsyncWebClient(token=token, session=_http_session())
+
+    async def user(self) -> User:
+        """
+        Retrieves the user information from Slack for the access_token
+
+        :return: User
+        """
+        try:
+            info, profile_res = await asyncio.gather(
+                self.client.openid_connect_userInfo(),
+                self.client.users_profile_get(),
+            )
+        except SlackApiError:
+            raise SlackError("invalid token")
+
+        for response in (info, profile_res):
+            if not response.get("ok", False):
+                raise SlackError(response.get("error"))
+
+        return _profile_user(info.get("sub"), profile_res.get("profile", {}))
+
+    async def team(self) -> Team:
+        """
+        Retrieves the team information from Slack for the access_token
+
+        :return: Team
+        """
+        info = await self.client.team_info()
+        if not info.get("ok", False):
+            raise SlackError(info.get("error"))
+        return _team(info.get("team", {}))
+
+    async def users(self) -> dict[str, User]:
+        """
+        Retrieves the users of the team, except bots
+
+        :return: users by id
+        """
+        users_list = {}
+        async for response in self._pages(self.client.users_list):
+            users_list.update(_members(response.get("members", [])))
+        return users_list
+
+    async def conversations(self) -> List[dict]:
+        """
+        Retrieves the channels and direct messages visible to the access_token
+
+        :return: the conversations as returned by Slack
+        """
+        channel_list = []
+        async for response in self._pages(
+            self.client.conversations_list,
+            exclude_archived=True,
+            types="public_channel, private_channel, im",
+        ):
+            channel_list += response.get("channels", [])
+        return channel_list
+
+    async def channels(self) -> List[Channel]:
+        """
+        Retrieves the channel information from Slack for the access_token
+
+        :return: List[Channel]
+        """
+        # users are only needed to name direct messages, so both lists load at once
+        users, channel_list = await asyncio.gather(self.users(), self.conversations())
+        return conversation_channels(channel_list, users)
+
+    @staticmethod
+    async def _pages(method, **kwargs):
+        """
+        Iterate over the pages of a paginated Slack API method
+
+        :param method: the AsyncWebClient method
+        :param kwargs: the arguments of the method
+        :return: async iterator of responses
+        """
+        next_cursor = None
+        while True:
+            response = await method(cursor=next_cursor, **kwargs)
+            if not response.get("ok", False):
+                raise SlackError(response.get("error"))
+            yield response
+
+            next_cursor = response.get("response_metadata", {}).get("next_cursor", None)
+            if not next_cursor:
+                break
+
+
+def _http_session():
+    """
+    Retrieve the HTTP session of the async Slack clients, creating it on first use.
+    The session is bound to the event loop running when it is created.
+
+    :return: aiohttp.ClientSession
+    """
+    global __http_session, __http_session_loop
+    loop = asyncio.get_running_loop()
+    if __http_session is None or __http_session_loop is not loop:
+        import aiohttp
+
+        __http_session = aiohttp.ClientSession()
+        __http_session_loop = loop
+    return __http_session
+
+
+async def close():
+    """
+    Close the HTTP connections of the async Slack clients.
+    :return: None
+    """
+    global __http_session, __http_session_loop
+    if __http_session is not None:
+        await __http_session.close()
+        __http_session = None
+        __http_session_loop = None
+
+
+def _profile_user(user_id: str, profile: dict) -> User:
+    return User(
+        id=user_id,
+        real_name=profile.get("real_name", ""),
+        real_name_normalized=profile.get("real_name_normalized", ""),
+        first_name=profile.get("first_name", ""),
+        last_name=profile.get("last_name", ""),
+        display_name=profile.get(
+            "display_name",
+            profile.get("first_name", ""),
+        ),
+        image=profile.get("image_48", ""),
+    )
+
+
+def _team(team: dict) -> Team:
+    return Team(
+        id=team.get("id", ""),
+        name=team.get("name", ""),
+        image=team.get("icon", {}).get("image_68", ""),
+    )
+
+
+def _members(members: List[dict]) -> dict[str, User]:
+    users = {}
+    for user in members:
+        if not user.get("is_bot", False):
+            profile = user.get("profile", {})
+            display_name = user.get("display_name", "")
+            if display_name == "":
+                display_name = (
+                    f"{profile.get('first_name', '')} "
+                    f"{profile.get('last_name', '')}"
+                ).strip()
+            if display_name == "":
+                display_name = profile.get("real_name", "")
+
+            if display_name != "":
+                users[user.get("id", "")] = User(
+                    id=user.get("id", ""),
+                    real_name=profile.get("real_name", ""),
+                    real_name_normalized=profile.get("real_name_normalized", ""),
+                    first_name=profile.get("first_name", ""),
+                    last_name=profile.get("last_name", ""),
+                    display_name=display_name,
+                    image=profile.get("image_48", ""),
+                )
+    return users
+
+
+def conversation_channels(
+    channels: List[dict], users: dict[str, User]
+) -> List[Channel]:
+    """
+    Name the conversations returned by Slack, naming direct messages after the user.
+    Direct messages with unknown users are left out.
+
+    :param channels: the conversations as returned by Slack
+    :param users: the users of the workspace by id
+    :return: the channels sorted by name
+    """
+    channel_list = []
+    for channel in channels:
+        if channel.get("is_im", False):
+            user = users.get(channel.get("user"), None)
+            if user:
+                channel_list.append(
+                    Channel(
+                        id=channel.get("id", ""),
+                        name=user.display_name,
+                        user_id=user.id,
+                    )
+                )
+        else:
+            channel_list.append(
+                Channel(id=channel.get("id", ""), name=channel.get("name", ""))
+            )
+    return sorted(channel_list, key=lambda x: x.name.lower())
+
+
 def _prepare_messages(
     messages: Dict[str, dict[str, str]], notify: bool
 ) -> List[Tuple[str, str]]:
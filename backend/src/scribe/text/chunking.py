@@ -0,0 +1,107 @@
+"""
+This module splits long recordings into overlapping chunks that can be
+transcribed in parallel, and stitches the chunk transcriptions back together.
+"""
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+# length of the frames used to measure loudness
+_FRAME_SECONDS = 0.03
+
+# the most words two neighbouring chunks are expected to share
+_MAX_OVERLAP_WORDS = 30
+
+# shorter overlaps are too likely to be a coincidence, such as a repeated "the"
+_MIN_OVERLAP_WORDS = 2
+
+
+def find_chunks(
+    audio: np.ndarray,
+    sample_rate: int,
+    chunk_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float = 5.0,
+) -> List[Tuple[float, float]]:
+    """
+    Split a waveform into chunks of roughly equal length.
+    Each cut is moved to the quietest point near the target length,
+    so words are rarely split, and chunks overlap to catch any that are.
+
+    :param audio: mono waveform
+    :param sample_rate: samples per second of the waveform
+    :param chunk_seconds: the target length of each chunk
+    :param overlap_seconds: how far each chunk extends past its cut points
+    :param search_seconds: how far from the target length to look for silence
+    :return: list of (start, end) offsets in seconds
+    """
+    duration = len(audio) / sample_rate
+    if duration <= chunk_seconds:
+        return [(0.0, duration)]
+
+    frame = max(1, int(_FRAME_SECONDS * sample_rate))
+    frame_seconds = frame / sample_rate
+    frames = len(audio) // frame
+    energy = np.sqrt(
+        np.mean(np.square(audio[: frames * frame].reshape(frames, frame)), axis=1)
+    )
+
+    cuts = [0.0]
+    while duration - cuts[-1] > chunk_seconds:
+        target = cuts[-1] + chunk_seconds
+        lo = int(
+            max(cuts[-1] + search_seconds, target - search_seconds) / frame_seconds
+        )
+        hi = int(min(duration, target + search_seconds) / frame_seconds)
+        lo, hi = min(lo, frames - 1), min(hi, frames)
+        if hi <= lo:
+            cuts.append(target)
+            continue
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append((quietest + 0.5) * frame_seconds)
+    cuts.append(duration)
+
+    return [
+        (max(0.0, start - overlap_seconds), min(duration, end + overlap_seconds))
+        for start, end in zip(cuts, cuts[1:])
+    ]
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge(previous: str, current: str) -> str:
+    """
+    Remove the words at the start of a chunk transcription
+    that repeat the end of the previous chunk.
+
+    :param previous: the transcription so far
+    :param current: the transcription of the next chunk
+    :return: the next chunk without the duplicated words
+    """
+    tail = [_normalize(w) for w in previous.split()[-_MAX_OVERLAP_WORDS:]]
+    words = current.split()
+    head = [_normalize(w) for w in words[:_MAX_OVERLAP_WORDS]]
+
+    for size in range(min(len(tail), len(head)), _MIN_OVERLAP_WORDS - 1, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(words[size:])
+
+    return current
+
+
+def stitch(texts: List[str]) -> str:
+    """
+    Join chunk transcriptions, removing words repeated in the overlaps.
+
+    :param texts: transcriptions of consecutive chunks
+    :return: the combined transcription
+    """
+    result = ""
+    for current in texts:
+        current = merge(result, current)
+        if current:
+            result = f"{result} {current}" if result else current
+    return result
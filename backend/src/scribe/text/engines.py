@@ -0,0 +1,144 @@
+"""
+This module provides the speech to text engines that can run transcriptions.
+
+whisper: the reference openai-whisper implementation, running fp32 on CPU.
+faster-whisper: CTranslate2 implementation of the same models with int8
+    quantization, several times faster and smaller on CPU-only hosts.
+    It is an optional dependency, installed with the ctranslate2 extra.
+"""
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+import numpy as np
+
+from scribe.text.registry import model_memory
+
+# audio is either a path to a file or a 16 kHz mono float32 waveform
+Audio = Union[str, np.ndarray]
+
+# the memory of a model by weight type, relative to the fp32 weights of whisper.
+# int8 weights take a quarter of the fp32 weights, plus runtime buffers.
+_COMPUTE_TYPE_MEMORY = {"int8": 1 / 3, "float16": 0.6, "bfloat16": 0.6, "float32": 1.0}
+
+
+class TranscriptionEngine(ABC):
+    """
+    This class defines the interface of a loaded speech to text model.
+    """
+
+    name = ""
+
+    def __init__(self, model: str):
+        """
+        Loads the model
+
+        :param model: the model size, such as tiny or base
+        """
+        self.model = model
+
+    @abstractmethod
+    def transcribe(self, audio: Audio, prompt: Optional[str] = None) -> str:
+        """
+        Transcribe audio
+
+        :param audio: path to an audio file or a 16 kHz waveform
+        :param prompt: text preceding the audio, to keep context across windows
+        :return: the transcribed text
+        """
+        pass
+
+    @staticmethod
+    def memory(model: str, **options) -> int:
+        """
+        Estimate the memory used by a loaded model
+
+        :param model: the model size
+        :param options: the engine specific options the model is loaded with
+        :return: the memory in MB
+        """
+        return model_memory(model)
+
+
+class WhisperEngine(TranscriptionEngine):
+    """
+    This class transcribes with openai-whisper.
+    """
+
+    name = "whisper"
+
+    def __init__(self, model: str):
+        # torch and whisper are imported here so that importing this module stays fast
+        import whisper
+
+        super().__init__(model)
+        self._model = whisper.load_model(model)
+        # the decoder keeps its key/value cache in hooks on the model,
+        # so threads sharing the model must take turns
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: Audio, prompt: Optional[str] = None) -> str:
+        # fp16 is not supported on CPU and only produces a warning
+        fp16 = self._model.device.type != "cpu"
+        with self._lock:
+            result = self._model.transcribe(audio, initial_prompt=prompt, fp16=fp16)
+        return result["text"].strip()
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """
+    This class transcribes with faster-whisper on CTranslate2.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model: str, compute_type: str = "int8"):
+        """
+        Loads the model
+
+        :param model: the model size, such as tiny or base
+        :param compute_type: the weight quantization, such as int8, float16 or float32
+        """
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as err:
+            raise RuntimeError(
+                "the faster-whisper engine needs the ctranslate2 extra: "
+                "poetry install --extras ctranslate2"
+            ) from err
+
+        super().__init__(model)
+        self.compute_type = compute_type
+        self._model = WhisperModel(model, device="cpu", compute_type=compute_type)
+
+    def transcribe(self, audio: Audio, prompt: Optional[str] = None) -> str:
+        segments, _ = self._model.transcribe(audio, initial_prompt=prompt)
+        return "".join(segment.text for segment in segments).strip()
+
+    @staticmethod
+    def memory(model: str, compute_type: str = "int8") -> int:
+        # int8_float16 and the like keep int8 weights
+        weights = "int8" if compute_type.startswith("int8") else compute_type
+        # unknown types, such as auto, are estimated as fp32 to stay within budget
+        return int(model_memory(model) * _COMPUTE_TYPE_MEMORY.get(weights, 1.0))
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def load_engine(engine: str, model: str, **options) -> TranscriptionEngine:
+    """
+    Load a model with a transcription engine
+
+    :param engine: the engine name: whisper | faster-whisper
+    :param model: the model size, such as tiny or base
+    :param options: engine specific options
+    :return: TranscriptionEngine
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown transcription engine: {engine}")
+
+    return ENGINES[engine](model, **options)
@@ -0,0 +1,52 @@
+"""
+This module manages the worker pool that transcription jobs are submitted to.
+
+Whisper inference is CPU bound and blocking, so it must never run on the event loop.
+Depending on settings, jobs are executed in a process pool (one model per worker,
+true parallelism across cores) or a thread pool (one model shared by the workers,
+lower memory). A whisper model runs one transcription at a time, so in a thread
+pool whisper jobs take turns and only the work around the model runs in parallel.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from scribe.config.settings import settings
+
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Executor:
+    """
+    Retrieve the transcription worker pool, creating it on first use.
+
+    :return: the configured Executor
+    """
+    global _executor
+    if _executor is None:
+        workers = settings.TRANSCRIPTION_WORKERS
+        # jobs sent to a transcription service only wait on a socket
+        if settings.TRANSCRIPTION_EXECUTOR == "thread" or settings.TRANSCRIPTION_SOCKET:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="transcription"
+            )
+        else:
+            # torch does not survive a fork once its thread pools are initialized,
+            # so worker processes are always spawned fresh.
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        logging.info(f"started {type(_executor).__name__} with {workers} workers")
+    return _executor
+
+
+def shutdown():
+    """
+    Shut down the transcription worker pool, cancelling any queued jobs.
+    :return: None
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
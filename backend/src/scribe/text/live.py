@@ -0,0 +1,217 @@
+"""
+This module transcribes recordings while they are still being recorded.
+
+The browser sends the recorder's chunks as they are produced. They are appended
+to the recording file and to a decoder, whose samples are appended to the PCM
+file of the recording. Whenever enough new audio has arrived the completed
+windows are transcribed in the worker pool,
+holding a slot of the transcription scheduler. When recording stops only the last
+window is left to transcribe, instead of the whole recording.
+"""
+import asyncio
+import hashlib
+import os
+from typing import Awaitable, List, Optional, TypeVar
+
+from scribe.audio import audio
+from scribe.exceptions import InvalidAudioException, UploadTooLargeException
+from scribe.text import chunking, executor, text
+from scribe.uploads import uploads
+
+T = TypeVar("T")
+
+
+class LiveTranscription:
+    """
+    This class receives a recording in chunks and transcribes it as it grows.
+    """
+
+    def __init__(
+        self,
+        recording_id: str,
+        directory: str,
+        model: str,
+        window_seconds: float,
+        max_bytes: int,
+    ):
+        """
+        Initializes the live transcription
+
+        :param recording_id: the id of the recording, used as the file name
+        :param directory: the folder to save the recording in
+        :param model: the whisper model name
+        :param window_seconds: the length of the windows transcribed while recording
+        :param max_bytes: the largest recording accepted
+        """
+        self.id = recording_id
+        self.directory = directory
+        self.model = model
+        self.window_seconds = window_seconds
+        self.max_bytes = max_bytes
+        self.file_path: Optional[str] = None
+        self.pcm_path: Optional[str] = None
+        self.duration = 0.0
+        self.size = 0
+        self._sha = hashlib.sha256()
+        self._file = None
+        self._segments: List[str] = []
+        self._transcribed = 0.0
+        self._last_pass = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._decoder: Optional[audio.StreamDecoder] = None
+        self._pcm: Optional[audio.PcmWriter] = None
+
+    @property
+    def audio_hash(self) -> str:
+        """
+        The sha256 hash of the audio received so far
+        """
+        return self._sha.hexdigest()
+
+    async def append(self, data: bytes):
+        """
+        Append a chunk of the recording and transcribe any completed windows.
+
+        :param data: the next bytes of the recording
+        :return: None
+        """
+        if self._file is None:
+            detected = uploads.sniff(data)
+            if detected is None:
+                raise InvalidAudioException(f"unsupported audio format: {data[:12]!r}")
+            self.file_path = os.path.join(self.directory, f"{self.id}{detected[1]}")
+            self.pcm_path = audio.pcm_path(self.file_path)
+            self._file = await asyncio.to_thread(open, self.file_path, "wb")
+            self._decoder = await asyncio.to_thread(audio.StreamDecoder)
+            self._pcm = await asyncio.to_thread(audio.PcmWriter, self.pcm_path)
+
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeException(f"recording exceeds {self.max_bytes} bytes")
+        self._sha.update(data)
+        await asyncio.to_thread(self._write, data)
+
+        # passes are spaced out to roughly one per half window of new audio,
+        # so each transcribes a window as soon as it is complete
+        now = asyncio.get_running_loop().time()
+        idle = self._task is None or self._task.done()
+        if idle and now - self._last_pass >= self.window_seconds / 2:
+            self._last_pass = now
+            self._task = asyncio.create_task(self._transcribe_ready(final=False))
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        self._decoder.write(data)
+
+    async def finish(self) -> str:
+        """
+        Transcribe the rest of the recording once recording has stopped.
+        The result is stored in the transcription cache, so the recording page
+        receives it as soon as it subscribes.
+
+        :return: the transcribed text
+        """
+        if self._file is None:
+            raise InvalidAudioException("no audio was received")
+
+        await asyncio.to_thread(self._file.close)
+        if self._task is not None:
+            await self._task
+        await self._transcribe_ready(final=True)
+
+        transcription = " ".join(self._segments)
+        key = text.transcription_key(self.audio_hash, self.model)
+        await asyncio.to_thread(text.transcription_cache().set, key, transcription)
+        return transcription
+
+    async def abort(self):
+        """
+        Stop transcribing and remove the files of an abandoned recording.
+        :return: None
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            # the pass only stops once the work it started in threads is done,
+            # so the files are no longer in use when they are removed
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+        if self._decoder is not None:
+            await asyncio.to_thread(self._decoder.kill)
+        if self._pcm is not None:
+            await asyncio.to_thread(self._pcm.close)
+        for path in (self.file_path, self.pcm_path):
+            if path and os.path.exists(path):
+                await asyncio.to_thread(os.unlink, path)
+
+    async def _transcribe_ready(self, final: bool):
+        """
+        Save the samples decoded since the last pass and transcribe the windows
+        after the last transcribed one. The last window may still grow, so it is
+        left for a later pass unless recording has stopped.
+
+        :param final: True when recording has stopped
+        :return: None
+        """
+        if final:
+            samples = await _in_thread(asyncio.to_thread(self._decoder.close))
+        else:
+            samples = self._decoder.read()
+        await _in_thread(asyncio.to_thread(self._pcm.append, samples))
+        if final:
+            await asyncio.to_thread(self._pcm.close)
+        self.duration = self._pcm.samples / audio.SAMPLE_RATE
+        if self.duration <= self._transcribed:
+            return
+
+        waveform = await _in_thread(
+            asyncio.to_thread(audio.load, self.pcm_path, self._transcribed)
+        )
+        windows = chunking.find_chunks(
+            waveform,
+            audio.SAMPLE_RATE,
+            self.window_seconds,
+            0.0,
+            search_seconds=self.window_seconds / 4,
+        )
+        del waveform
+        if not final:
+            windows = windows[:-1]
+
+        loop = asyncio.get_running_loop()
+        offset = self._transcribed
+        for start, end in windows:
+            prompt = self._segments[-1] if self._segments else None
+            async with text.scheduler().slot(end - start):
+                segment = await _in_thread(
+                    loop.run_in_executor(
+                        executor.get_executor(),
+                        text.transcribe_window,
+                        self.pcm_path,
+                        offset + start,
+                        offset + end,
+                        prompt,
+                        self.model,
+                    )
+                )
+            self._transcribed = offset + end
+            if segment:
+                self._segments.append(segment)
+
+
+async def _in_thread(work: Awaitable[T]) -> T:
+    """
+    Wait for work running in a thread.
+    Threads cannot be interrupted, so when the caller is cancelled
+    the work is waited for before the cancellation is raised.
+
+    :param work: the awaitable of the work
+    :return: the result of the work
+    """
+    future = asyncio.ensure_future(work)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
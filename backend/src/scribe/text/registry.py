@@ -0,0 +1,94 @@
+"""
+This module keeps the loaded transcription models within a memory budget.
+
+Models are loaded on first use and the least recently used ones are
+unloaded when loading another would exceed the budget, so small models can
+serve quick voice notes without keeping every model size resident.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+# approximate resident memory of each loaded whisper model
+MODEL_MEMORY_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3_100,
+    "large": 6_200,
+}
+
+
+def model_memory(name: str) -> int:
+    """
+    Estimate the memory used by a loaded model
+
+    :param name: the model name, e.g. base or small.en
+    :return: the memory in MB
+    """
+    size = name.split(".")[0].split("-")[0]
+    return MODEL_MEMORY_MB.get(size, MODEL_MEMORY_MB["large"])
+
+
+class ModelRegistry:
+    """
+    This class loads models by name and evicts the least recently used
+    models when the total memory estimate exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        budget_mb: int,
+        memory: Callable[[str], int] = model_memory,
+    ):
+        """
+        Initializes the registry
+
+        :param loader: function that loads a model by name
+        :param budget_mb: the memory allowed for loaded models
+        :param memory: function estimating the memory of a model in MB
+        """
+        self._loader = loader
+        self.budget_mb = budget_mb
+        self._memory = memory
+        self._models: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> list[str]:
+        """
+        The names of the loaded models, least recently used first
+        """
+        return list(self._models.keys())
+
+    def get(self, name: str) -> Any:
+        """
+        Retrieve a model, loading it if needed.
+
+        :param name: the model name
+        :return: the loaded model
+        """
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+
+            needed = self._memory(name)
+            while self._models and self._used() + needed > self.budget_mb:
+                evicted, _ = self._models.popitem(last=False)
+                logging.info(f"unloading model {evicted} to stay within memory budget")
+
+            if needed > self.budget_mb:
+                logging.warning(
+                    f"model {name} needs about {needed}MB, "
+                    f"more than the {self.budget_mb}MB budget"
+                )
+
+            logging.info(f"loading model {name}")
+            self._models[name] = self._loader(name)
+            return self._models[name]
+
+    def _used(self) -> int:
+        return sum(self._memory(name) for name in self._models)
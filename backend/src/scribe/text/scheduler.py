@@ -0,0 +1,404 @@
+"""
+This module provides admission control for transcription jobs.
+
+Jobs wait in a priority queue and only a bounded number run at once,
+so each job gets a predictable share of the CPU instead of every job
+slowing down together. Every change in a job's state is recorded as a
+TranscriptionEvent that any number of subscribers can watch.
+
+Other transcription work, such as the windows of live recordings, holds the
+same slots, so it is counted in queue positions and estimates. It is started
+ahead of queued jobs, since someone is waiting on it while they record.
+
+Jobs nobody watches for a grace period are cancelled, so closed tabs do not
+keep using the CPU. Transcription runs in worker pools that cannot interrupt
+a model mid-call, so a cancelled job stops after its current window or chunk.
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from scribe.models.models import TranscriptionEvent, TranscriptionEventType
+
+# assumed length of a recording when its duration could not be read
+_DEFAULT_DURATION = 60.0
+
+# weight of the latest job when updating the real-time factor estimate
+_SMOOTHING = 0.3
+
+_TERMINAL_EVENTS = (
+    TranscriptionEventType.complete,
+    TranscriptionEventType.failed,
+    TranscriptionEventType.cancelled,
+)
+
+
+class TranscriptionJob:
+    """
+    This class tracks a single transcription request and its event history.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        file_path: str,
+        duration: Optional[float] = None,
+        model: Optional[str] = None,
+        audio_hash: Optional[str] = None,
+    ):
+        """
+        Initializes the job
+
+        :param job_id: unique id of the job, usually the recording id
+        :param file_path: the path to the audio file
+        :param duration: the length of the audio in seconds, if known
+        :param model: the name of the model to transcribe with
+        :param audio_hash: the hash of the audio content, if known
+        """
+        self.id = job_id
+        # identifies this run of the job, as a job id can be submitted again
+        self.run_id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.duration = duration
+        self.model = model
+        self.audio_hash = audio_hash
+        self.events: List[TranscriptionEvent] = []
+        self.started_at: Optional[float] = None
+        self.subscribers = 0
+        self.idle_since: Optional[float] = time.monotonic()
+        self.on_idle: Optional[Callable[["TranscriptionJob"], None]] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        """
+        Flag for if the job has completed or failed
+        """
+        return bool(self.events) and self.events[-1].type in _TERMINAL_EVENTS
+
+    @property
+    def cost(self) -> float:
+        """
+        The audio duration used for scheduling estimates
+        """
+        return self.duration if self.duration is not None else _DEFAULT_DURATION
+
+    def publish(self, event: TranscriptionEvent):
+        """
+        Record an event and wake up any subscribers.
+
+        :param event: the event to record
+        :return: None
+        """
+        self.events.append(event)
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def watch(self, after: int = 0) -> AsyncIterator[TranscriptionEvent]:
+        """
+        Iterate over the job events as they are published,
+        ending after the job completes, fails or is cancelled.
+        The job counts as watched until the iterator is closed.
+
+        :param after: the number of events to skip
+        :return: an async iterator of TranscriptionEvents
+        """
+        self.subscribers += 1
+        self.idle_since = None
+        try:
+            index = after
+            while True:
+                while index < len(self.events):
+                    event = self.events[index]
+                    index += 1
+                    yield event
+                    if event.type in _TERMINAL_EVENTS:
+                        return
+                if self.done:
+                    # resuming after the last event of a finished job
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0:
+                self.idle_since = time.monotonic()
+                if self.on_idle is not None and not self.done:
+                    self.on_idle(self)
+
+
+class TranscriptionScheduler:
+    """
+    This class queues transcription jobs and runs a bounded number at a time.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[TranscriptionJob], Awaitable[str]],
+        max_jobs: int,
+        policy: str = "fifo",
+        realtime_factor: float = 0.5,
+        retained_jobs: int = 100,
+        abandon_after: Optional[float] = 30.0,
+    ):
+        """
+        Initializes the scheduler
+
+        :param transcribe: coroutine function that transcribes a job
+        :param max_jobs: the number of jobs allowed to run concurrently
+        :param policy: queue order: fifo | shortest
+        :param realtime_factor: initial estimate of processing seconds
+               per second of audio, refined as jobs complete
+        :param retained_jobs: the number of completed jobs kept for reconnecting clients
+        :param abandon_after: seconds without subscribers before a job is cancelled,
+               or None to never cancel jobs
+        """
+        self._transcribe = transcribe
+        self._max_jobs = max(1, max_jobs)
+        self._policy = policy
+        self.realtime_factor = realtime_factor
+        self._counter = itertools.count()
+        self._queue: List[Tuple[float, int, TranscriptionJob]] = []
+        self._running: Dict[str, TranscriptionJob] = {}
+        self._jobs: Dict[str, TranscriptionJob] = {}
+        self._retained_jobs = retained_jobs
+        self._completed: OrderedDict[str, TranscriptionJob] = OrderedDict()
+        self._abandon_after = abandon_after
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # running and waiting work held outside the queue, as (started_at, cost)
+        self._slots: Dict[int, Tuple[float, float]] = {}
+        self._slot_waiters: OrderedDict[
+            int, Tuple[float, asyncio.Future]
+        ] = OrderedDict()
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        """
+        Retrieve a queued, running or recently completed job
+
+        :param job_id: the id of the job
+        :return: the job or None
+        """
+        return self._jobs.get(job_id, None) or self._completed.get(job_id, None)
+
+    def submit(
+        self,
+        job_id: str,
+        file_path: str,
+        duration: Optional[float] = None,
+        model: Optional[str] = None,
+        audio_hash: Optional[str] = None,
+    ) -> TranscriptionJob:
+        """
+        Queue a transcription job.
+        If a job with the same id is queued, running or completed, it is reused.
+
+        :param job_id: unique id of the job
+        :param file_path: the path to the audio file
+        :param duration: the length of the audio in seconds, if known
+        :param model: the name of the model to transcribe with
+        :param audio_hash: the hash of the audio content, if known
+        :return: the TranscriptionJob
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return job
+
+        job = TranscriptionJob(job_id, file_path, duration, model, audio_hash)
+        self._jobs[job_id] = job
+        priority = job.cost if self._policy == "shortest" else 0.0
+        heapq.heappush(self._queue, (priority, next(self._counter), job))
+        if self._abandon_after is not None:
+            # the job has no subscribers yet, so its grace period starts now
+            job.on_idle = self._schedule_abandon_check
+            self._schedule_abandon_check(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id: str):
+        """
+        Cancel a queued or running job.
+
+        :param job_id: the id of the job
+        :return: None
+        """
+        job = self._jobs.get(job_id, None)
+        if job is None:
+            return
+
+        if job_id in self._tasks:
+            # _run publishes the cancellation and frees the slot
+            self._tasks[job_id].cancel()
+            return
+
+        self._queue = [entry for entry in self._queue if entry[2] is not job]
+        heapq.heapify(self._queue)
+        self._jobs.pop(job_id, None)
+        job.publish(TranscriptionEvent(type=TranscriptionEventType.cancelled))
+        self._publish_positions()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, cost: float) -> AsyncIterator[None]:
+        """
+        Hold one of the running slots for transcription work that is not a job,
+        waiting ahead of queued jobs until one is free.
+
+        :param cost: the audio duration of the work in seconds
+        :return: an async context manager holding the slot
+        """
+        key = next(self._counter)
+        waiter = asyncio.get_running_loop().create_future()
+        self._slot_waiters[key] = (cost, waiter)
+        try:
+            self._dispatch()
+            await waiter
+            yield
+        finally:
+            self._slot_waiters.pop(key, None)
+            if self._slots.pop(key, None) is not None:
+                self._dispatch()
+
+    def _busy(self) -> int:
+        return len(self._running) + len(self._slots)
+
+    def _schedule_abandon_check(self, job: TranscriptionJob):
+        asyncio.get_running_loop().call_later(
+            self._abandon_after, self._cancel_if_abandoned, job
+        )
+
+    def _cancel_if_abandoned(self, job: TranscriptionJob):
+        """
+        Cancel a job that has had no subscribers for the whole grace period.
+
+        :param job: the job to check
+        :return: None
+        """
+        if job.done or job.subscribers > 0 or job.idle_since is None:
+            return
+
+        # a subscriber may have come and gone since this check was scheduled
+        remaining = job.idle_since + self._abandon_after - time.monotonic()
+        if remaining > 0:
+            asyncio.get_running_loop().call_later(
+                remaining, self._cancel_if_abandoned, job
+            )
+            return
+
+        logging.info(f"cancelling abandoned transcription job {job.id}")
+        self.cancel(job.id)
+
+    def _dispatch(self):
+        """
+        Start queued jobs while there is free capacity,
+        then publish the new queue positions.
+        :return: None
+        """
+        while self._slot_waiters and self._busy() < self._max_jobs:
+            key, (cost, waiter) = self._slot_waiters.popitem(last=False)
+            if not waiter.done():
+                self._slots[key] = (time.monotonic(), cost)
+                waiter.set_result(None)
+
+        while self._queue and self._busy() < self._max_jobs:
+            _, _, job = heapq.heappop(self._queue)
+            self._running[job.id] = job
+            job.started_at = time.monotonic()
+            job.publish(TranscriptionEvent(type=TranscriptionEventType.started))
+            self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+        self._publish_positions()
+
+    def _publish_positions(self):
+        """
+        Estimate when each queued job will start and notify jobs whose
+        position in the queue has changed.
+        :return: None
+        """
+        now = time.monotonic()
+        running = [(job.started_at, job.cost) for job in self._running.values()]
+        slots = [
+            max(0.0, cost * self.realtime_factor - (now - started_at))
+            for started_at, cost in running + list(self._slots.values())
+        ]
+        slots += [0.0] * (self._max_jobs - len(slots))
+        heapq.heapify(slots)
+        for cost, _ in self._slot_waiters.values():
+            start = heapq.heappop(slots)
+            heapq.heappush(slots, start + cost * self.realtime_factor)
+
+        for position, (_, _, job) in enumerate(sorted(self._queue), start=1):
+            start = heapq.heappop(slots)
+            heapq.heappush(slots, start + job.cost * self.realtime_factor)
+
+            estimated_start = round(start)
+            last = job.events[-1] if job.events else None
+            if (
+                last is None
+                or last.position != position
+                or last.estimated_start != estimated_start
+            ):
+                job.publish(
+                    TranscriptionEvent(
+                        type=TranscriptionEventType.queued,
+                        position=position,
+                        estimated_start=estimated_start,
+                    )
+                )
+
+    async def _run(self, job: TranscriptionJob):
+        """
+        Transcribe a job and publish the outcome.
+
+        :param job: the job to run
+        :return: None
+        """
+        try:
+            text = await self._transcribe(job)
+            self._update_realtime_factor(job)
+            job.publish(
+                TranscriptionEvent(type=TranscriptionEventType.complete, text=text)
+            )
+            self._retain(job)
+        except asyncio.CancelledError:
+            job.publish(TranscriptionEvent(type=TranscriptionEventType.cancelled))
+        except Exception as err:
+            logging.warning(f"error transcribing audio: {err}")
+            job.publish(
+                TranscriptionEvent(type=TranscriptionEventType.failed, error=str(err))
+            )
+        finally:
+            self._running.pop(job.id, None)
+            self._jobs.pop(job.id, None)
+            self._tasks.pop(job.id, None)
+            self._dispatch()
+
+    def _retain(self, job: TranscriptionJob):
+        """
+        Keep a completed job so clients that reconnect receive its result.
+        Failed jobs are not kept, so submitting them again retries them.
+
+        :param job: the completed job
+        :return: None
+        """
+        self._completed[job.id] = job
+        while len(self._completed) > self._retained_jobs:
+            self._completed.popitem(last=False)
+
+    def _update_realtime_factor(self, job: TranscriptionJob):
+        """
+        Refine the processing speed estimate with a completed job.
+
+        :param job: the completed job
+        :return: None
+        """
+        if not job.duration:
+            return
+
+        elapsed = time.monotonic() - job.started_at
+        self.realtime_factor = (1 - _SMOOTHING) * self.realtime_factor + _SMOOTHING * (
+            elapsed / job.duration
+        )
@@ -0,0 +1,73 @@
+"""
+This module splits HTML messages into block level segments for translation.
+
+Edited messages usually change a sentence or two, so translating and caching
+each paragraph on its own means a republished message only sends the changed
+paragraphs to the translator. Segments are cut only between top level blocks,
+so every segment is balanced HTML and joining them restores the message.
+"""
+import re
+from typing import List
+
+BLOCK_TAGS = {
+    "blockquote",
+    "div",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "ol",
+    "p",
+    "pre",
+    "table",
+    "ul",
+}
+
+_TAG = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)[^>]*?(/?)>")
+
+_SPACE = re.compile(r"\s*")
+
+
+def split(html: str) -> List[str]:
+    """
+    Split HTML after each top level block element.
+    The whitespace between blocks is kept in segments of its own,
+    so reformatting a message does not change the segments to translate.
+
+    :param html: the HTML to split
+    :return: the segments, which join back into the original HTML
+    """
+    segments = []
+    start = 0
+    depth = 0
+    for tag in _TAG.finditer(html):
+        closing, name, self_closing = tag.groups()
+        if name.lower() not in BLOCK_TAGS or self_closing:
+            continue
+
+        if not closing:
+            depth += 1
+            continue
+
+        depth = max(depth - 1, 0)
+        if depth == 0:
+            segments.append(html[start : tag.end()])
+            start = _SPACE.match(html, tag.end()).end()
+            if start > tag.end():
+                segments.append(html[tag.end() : start])
+
+    if start < len(html):
+        segments.append(html[start:])
+    return segments
+
+
+def is_blank(segment: str) -> bool:
+    """
+    Check whether a segment has no text to translate
+
+    :param segment: the HTML segment
+    :return: True if the segment is only tags and whitespace
+    """
+    return _TAG.sub("", segment).strip() == ""
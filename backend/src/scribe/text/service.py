@@ -0,0 +1,147 @@
+"""
+This module runs transcription as a standalone service on a Unix domain socket.
+
+A single service process owns the whisper model and can be shared by any
+number of web workers, so model memory does not grow with the web tier.
+Start it with the `scribe-transcriber` command and point the web workers
+at the same socket through the SCRIBE_TRANSCRIPTION_SOCKET setting.
+
+Each connection carries one request and one response, both a line of JSON.
+request:  {"method": "transcribe", "params": {"file_path": "..."}}
+response: {"result": "..."} or {"error": {"type": "...", "message": "..."}}
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from typing import Any
+
+from scribe.config.settings import settings
+
+# errors raised by the service that are raised again in the client
+_ERRORS = {"FileNotFoundError": FileNotFoundError, "RuntimeError": RuntimeError}
+
+
+def request(method: str, **params: Any) -> Any:
+    """
+    Call a method of the transcription service and wait for the result.
+
+    :param method: transcribe | transcribe_window
+    :param params: the keyword arguments of the method
+    :return: the method result
+    """
+    payload = json.dumps({"method": method, "params": params}).encode("utf-8")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            # a hung service would otherwise hold the worker thread forever
+            sock.settimeout(settings.TRANSCRIPTION_SOCKET_TIMEOUT_SECONDS)
+            sock.connect(settings.TRANSCRIPTION_SOCKET)
+            sock.sendall(payload + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except socket.timeout as err:
+        raise RuntimeError("transcription service did not answer in time") from err
+    except OSError as err:
+        raise RuntimeError(f"transcription service unavailable: {err}") from err
+
+    if not line:
+        raise RuntimeError("transcription service closed the connection")
+
+    response = json.loads(line)
+    if "error" in response:
+        error = response["error"]
+        raise _ERRORS.get(error.get("type"), RuntimeError)(error.get("message"))
+
+    return response.get("result")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    This class answers a single transcription request.
+    """
+
+    def handle(self):
+        from scribe.text import text
+
+        methods = {
+            "transcribe": text.transcribe_local,
+            "transcribe_window": text.transcribe_window_local,
+        }
+        try:
+            req = json.loads(self.rfile.readline())
+            method = methods[req["method"]]
+            with self.server.slots:
+                response = {"result": method(**req.get("params", {}))}
+        except Exception as err:
+            logging.warning(f"transcription request failed: {err}")
+            response = {"error": {"type": type(err).__name__, "message": str(err)}}
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class TranscriptionServer(socketserver.ThreadingUnixStreamServer):
+    """
+    This class serves transcription requests on a Unix domain socket,
+    running a bounded number of them at once.
+    Requests share the models loaded in the service, and a whisper model
+    runs one transcription at a time, so requests for it take turns.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, workers: int):
+        """
+        Initializes the server
+
+        :param path: the path of the socket
+        :param workers: the number of requests transcribed at once
+        """
+        if os.path.exists(path):
+            os.unlink(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.slots = threading.BoundedSemaphore(workers)
+        super().__init__(path, _RequestHandler)
+
+
+def main():
+    """
+    Entry point of the transcription service.
+    :return: None
+    """
+    from scribe import config
+    from scribe.text import text
+
+    parser = argparse.ArgumentParser(description="Scribe transcription service")
+    parser.add_argument(
+        "--socket",
+        default=settings.TRANSCRIPTION_SOCKET
+        or os.path.join(settings.UPLOAD_PATH, "transcriber.sock"),
+        help="path of the Unix socket to listen on",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.TRANSCRIPTION_WORKERS,
+        help="number of requests handled at once",
+    )
+    args = parser.parse_args()
+
+    config.init()
+    text.get_engine()
+
+    with TranscriptionServer(args.socket, args.workers) as server:
+        logging.info(f"transcription service listening on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
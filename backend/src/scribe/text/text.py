@@ -1,35 +1,479 @@
 """
 This module provides functionality for manipulating text.
 """
+import asyncio
 import logging
 import os
-import re
-
-import deepl
-import whisper
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Set
 
+from scribe.audio import audio
+from scribe.cache.cache import SingleFlight, TieredCache, digest, file_digest
 from scribe.config.settings import settings
+from scribe.models.models import (
+    TranscriptionEvent,
+    TranscriptionEventType,
+    TranslationUsage,
+)
+from scribe.text import chunking, engines, executor, segments, service
+from scribe.text.engines import TranscriptionEngine
+from scribe.text.registry import ModelRegistry
+from scribe.text.scheduler import TranscriptionJob, TranscriptionScheduler
+from scribe.text.translation import (
+    BACKENDS,
+    DeepLBackend,
+    MarianBackend,
+    PseudoBackend,
+    TranslationBackend,
+)
+from scribe.text.translator import DeepLClient, DeepLError
+
+_registry: Optional[ModelRegistry] = None
 
-model = whisper.load_model("base")
+# warm up loads the model in every thread worker at once
+_registry_lock = threading.Lock()
 
 _listeners = []
 
-_translator = deepl.Translator(settings.DEEPL_API_KEY)
+_scheduler: Optional[TranscriptionScheduler] = None
+
+_transcription_cache: Optional[TieredCache] = None
+
+_translator: Optional[DeepLClient] = None
+
+# the pooled connections of the translator belong to the event loop that opened them
+_translator_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_translation_cache: Optional[TieredCache] = None
+
+# the translation backends created so far, by name, except DeepL
+_backends: Dict[str, TranslationBackend] = {}
+
+# concurrent requests for the same translations share one backend request
+_translation_flights = SingleFlight()
+
+# the next text to pre-translate by key, present while a key is being translated
+_pretranslations: Dict[str, Optional[str]] = {}
+
+_pretranslation_tasks: Set[asyncio.Task] = set()
+
+
+def model_name(profile: Optional[str] = None) -> str:
+    """
+    Find the whisper model for a transcription profile
+
+    :param profile: a profile from WHISPER_PROFILES, such as fast or accurate
+    :return: the model name, falling back on the default profile
+    """
+    profiles = settings.WHISPER_PROFILES
+    return profiles.get(profile, profiles[settings.WHISPER_DEFAULT_PROFILE])
+
+
+def _engine_options() -> dict:
+    options = {}
+    if settings.TRANSCRIPTION_ENGINE == engines.FasterWhisperEngine.name:
+        options["compute_type"] = settings.TRANSCRIPTION_COMPUTE_TYPE
+    return options
+
+
+def _load_engine(name: str) -> TranscriptionEngine:
+    return engines.load_engine(settings.TRANSCRIPTION_ENGINE, name, **_engine_options())
+
+
+def _engine_memory(name: str) -> int:
+    engine = engines.ENGINES[settings.TRANSCRIPTION_ENGINE]
+    return engine.memory(name, **_engine_options())
+
+
+def get_engine(name: Optional[str] = None) -> TranscriptionEngine:
+    """
+    Retrieve the transcription engine for a model, loading it on first use.
+
+    :param name: the model name, defaults to the model of the default profile
+    :return: TranscriptionEngine
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(
+                _load_engine,
+                settings.WHISPER_MEMORY_BUDGET_MB,
+                _engine_memory,
+            )
+    return _registry.get(name or model_name())
+
+
+def _load_model():
+    # returns nothing so process workers do not send the model back
+    get_engine()
+
+
+async def warm_up():
+    """
+    Load the whisper model in every transcription worker ahead of the first request.
+    :return: None
+    """
+    if settings.TRANSCRIPTION_SOCKET:
+        # the transcription service loads its own model
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = executor.get_executor()
+    try:
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(pool, _load_model)
+                for _ in range(settings.TRANSCRIPTION_WORKERS)
+            ]
+        )
+        logging.info("transcription workers are ready")
+    except Exception as err:
+        logging.warning(f"could not warm up transcription workers: {err}")
+
+
+def transcribe(file_path: str, model: Optional[str] = None) -> str:
+    """
+    Transcribe an audio file.
+    When a transcription service socket is configured, the service does the work.
+
+    :param file_path: the path to the audio file
+    :param model: the whisper model name
+    :return: the transcribed text
+    """
+    if settings.TRANSCRIPTION_SOCKET:
+        return service.request("transcribe", file_path=file_path, model=model)
+
+    return transcribe_local(file_path, model)
+
+
+def transcribe_local(file_path: str, model: Optional[str] = None) -> str:
+    """
+    Transcribe an audio file with a model loaded in this process
+
+    :param file_path: the path to the audio or PCM file
+    :param model: the whisper model name
+    :return: the transcribed text
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File {file_path} does not exist")
+
+    if audio.is_pcm(file_path):
+        return get_engine(model).transcribe(audio.load(file_path))
+    return get_engine(model).transcribe(file_path)
 
 
-def transcribe(file_path: str) -> str:
+async def transcribe_async(file_path: str, model: Optional[str] = None) -> str:
     """
-    Transcribe an audio file
+    Transcribe an audio file in the transcription worker pool,
+    leaving the event loop free to serve other requests.
 
     :param file_path: the path to the audio file
+    :param model: the whisper model name
     :return: the transcribed text
     """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor.get_executor(), transcribe, file_path, model
+    )
+
+
+def transcribe_window(
+    file_path: str,
+    start: float,
+    end: float,
+    prompt: Optional[str] = None,
+    model: Optional[str] = None,
+) -> str:
+    """
+    Transcribe a window of an audio file.
+    When a transcription service socket is configured, the service does the work.
+
+    :param file_path: the path to the audio file
+    :param start: the offset in seconds where the window starts
+    :param end: the offset in seconds where the window ends
+    :param prompt: previously transcribed text, to keep context across windows
+    :param model: the whisper model name
+    :return: the transcribed text of the window
+    """
+    if settings.TRANSCRIPTION_SOCKET:
+        return service.request(
+            "transcribe_window",
+            file_path=file_path,
+            start=start,
+            end=end,
+            prompt=prompt,
+            model=model,
+        )
+
+    return transcribe_window_local(file_path, start, end, prompt, model)
+
+
+def transcribe_window_local(
+    file_path: str,
+    start: float,
+    end: float,
+    prompt: Optional[str] = None,
+    model: Optional[str] = None,
+) -> str:
+    """
+    Transcribe a window of an audio file with a model loaded in this process
 
+    :param file_path: the path to the audio file
+    :param start: the offset in seconds where the window starts
+    :param end: the offset in seconds where the window ends
+    :param prompt: previously transcribed text, to keep context across windows
+    :param model: the whisper model name
+    :return: the transcribed text of the window
+    """
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"File {file_path} does not exist")
 
-    result = model.transcribe(file_path)
-    return result["text"].strip()
+    waveform = audio.load(file_path, start, end)
+    if waveform.size == 0:
+        return ""
+
+    return get_engine(model).transcribe(waveform, prompt)
+
+
+async def transcribe_stream(
+    file_path: str, duration: Optional[float], model: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Transcribe an audio file window by window in the transcription worker pool,
+    yielding text as soon as each window is done.
+    Windows are cut at the quietest point near their target length and overlap,
+    so words repeated in the overlaps are removed.
+
+    :param file_path: the path to the audio file
+    :param duration: the length of the audio in seconds
+    :param model: the whisper model name
+    :return: an async iterator of transcribed text segments
+    """
+    window = settings.TRANSCRIPTION_STREAM_WINDOW_SECONDS
+    if not duration or duration <= window:
+        yield await transcribe_async(file_path, model)
+        return
+
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File {file_path} does not exist")
+
+    waveform = await asyncio.to_thread(audio.load, file_path)
+    windows = chunking.find_chunks(
+        waveform,
+        audio.SAMPLE_RATE,
+        window,
+        settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+        search_seconds=window / 4,
+    )
+    del waveform
+
+    loop = asyncio.get_running_loop()
+    text = ""
+    prompt = None
+    for start, end in windows:
+        segment = await loop.run_in_executor(
+            executor.get_executor(),
+            transcribe_window,
+            file_path,
+            start,
+            end,
+            prompt,
+            model,
+        )
+        if segment:
+            prompt = segment
+        segment = chunking.merge(text, segment)
+        if segment:
+            text = f"{text} {segment}" if text else segment
+            yield segment
+
+
+async def transcribe_chunks(
+    file_path: str, model: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Transcribe a long audio file by splitting it at silences into overlapping chunks
+    that are transcribed in parallel across the worker pool.
+    Chunks are yielded in order with words repeated in the overlaps removed.
+
+    :param file_path: the path to the audio file
+    :param model: the whisper model name
+    :return: an async iterator of transcribed text segments
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File {file_path} does not exist")
+
+    waveform = await asyncio.to_thread(audio.load, file_path)
+    chunks = chunking.find_chunks(
+        waveform,
+        audio.SAMPLE_RATE,
+        settings.TRANSCRIPTION_CHUNK_SECONDS,
+        settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+    )
+    del waveform
+
+    loop = asyncio.get_running_loop()
+    futures = [
+        loop.run_in_executor(
+            executor.get_executor(),
+            transcribe_window,
+            file_path,
+            start,
+            end,
+            None,
+            model,
+        )
+        for start, end in chunks
+    ]
+    text = ""
+    try:
+        for future in futures:
+            segment = chunking.merge(text, await future)
+            if segment:
+                text = f"{text} {segment}" if text else segment
+                yield segment
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def scheduler() -> TranscriptionScheduler:
+    """
+    Retrieve the transcription scheduler, creating it on first use.
+
+    :return: TranscriptionScheduler
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TranscriptionScheduler(
+            _transcribe_job,
+            max_jobs=settings.TRANSCRIPTION_MAX_JOBS,
+            policy=settings.TRANSCRIPTION_QUEUE_POLICY,
+            realtime_factor=settings.TRANSCRIPTION_REALTIME_FACTOR,
+            retained_jobs=settings.TRANSCRIPTION_RETAINED_JOBS,
+            abandon_after=settings.TRANSCRIPTION_ABANDON_SECONDS,
+        )
+    return _scheduler
+
+
+def transcription_cache() -> TieredCache:
+    """
+    Retrieve the transcription cache, creating it on first use.
+
+    :return: TieredCache
+    """
+    global _transcription_cache
+    if _transcription_cache is None:
+        _transcription_cache = TieredCache(
+            max_items=settings.TRANSCRIPTION_CACHE_ITEMS,
+            path=os.path.join(settings.UPLOAD_PATH, "cache", "transcriptions"),
+            max_bytes=settings.TRANSCRIPTION_CACHE_MAX_BYTES,
+        )
+    return _transcription_cache
+
+
+def transcription_key(audio_hash: str, model: str) -> str:
+    """
+    Build the cache key of a transcription from the audio content,
+    the model and every option that changes the output.
+
+    :param audio_hash: the hash of the uploaded audio
+    :param model: the whisper model name
+    :return: cache key
+    """
+    options = (
+        f"engine={settings.TRANSCRIPTION_ENGINE}"
+        f"&compute={settings.TRANSCRIPTION_COMPUTE_TYPE}"
+        f"&streaming={settings.TRANSCRIPTION_STREAMING}"
+        f"&window={settings.TRANSCRIPTION_STREAM_WINDOW_SECONDS}"
+        f"&long={settings.TRANSCRIPTION_LONG_AUDIO_SECONDS}"
+        f"&chunk={settings.TRANSCRIPTION_CHUNK_SECONDS}"
+        f"&overlap={settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS}"
+    )
+    return digest(audio_hash, model, options)
+
+
+async def submit_transcription(
+    job_id: str,
+    file_path: str,
+    profile: Optional[str] = None,
+    duration: Optional[float] = None,
+    audio_hash: Optional[str] = None,
+) -> TranscriptionJob:
+    """
+    Queue an audio file for transcription.
+    Progress and the result are published as events on the returned job.
+    Audio that was transcribed before is answered from the cache immediately.
+
+    :param job_id: unique id for the job, usually the recording id
+    :param file_path: the path to the audio file
+    :param profile: the transcription profile, such as fast or accurate
+    :param duration: the length of the audio in seconds, read from the file if None
+    :param audio_hash: the hash of the uploaded audio, computed from the file if None
+    :return: TranscriptionJob
+    """
+    job = scheduler().get(job_id)
+    if job is not None:
+        return job
+
+    model = model_name(profile)
+    if audio_hash is None and os.path.isfile(file_path):
+        audio_hash = await asyncio.to_thread(file_digest, file_path)
+
+    if audio_hash is not None:
+        key = transcription_key(audio_hash, model)
+        cached = await asyncio.to_thread(transcription_cache().get, key)
+        if cached is not None:
+            logging.debug(f"transcription cache hit for {job_id}")
+            job = TranscriptionJob(job_id, file_path, model=model)
+            job.publish(
+                TranscriptionEvent(type=TranscriptionEventType.complete, text=cached)
+            )
+            return job
+
+    if duration is None:
+        duration = await asyncio.to_thread(audio.duration, file_path)
+    return scheduler().submit(job_id, file_path, duration, model, audio_hash)
+
+
+async def _transcribe_job(job: TranscriptionJob) -> str:
+    """
+    Transcribe the audio of a scheduled job and cache the result.
+
+    :param job: the job to transcribe
+    :return: the transcribed text
+    """
+    text = await _transcribe_uncached(job)
+    if job.audio_hash is not None:
+        key = transcription_key(job.audio_hash, job.model)
+        await asyncio.to_thread(transcription_cache().set, key, text)
+    return text
+
+
+async def _transcribe_uncached(job: TranscriptionJob) -> str:
+    """
+    Transcribe the audio of a scheduled job.
+    Long recordings are split into chunks transcribed in parallel.
+    In streaming mode each segment is published on the job as it is transcribed.
+
+    :param job: the job to transcribe
+    :return: the transcribed text
+    """
+    if job.duration and job.duration >= settings.TRANSCRIPTION_LONG_AUDIO_SECONDS:
+        stream = transcribe_chunks(job.file_path, job.model)
+    elif settings.TRANSCRIPTION_STREAMING:
+        stream = transcribe_stream(job.file_path, job.duration, job.model)
+    else:
+        return await transcribe_async(job.file_path, job.model)
+
+    segments = []
+    async for segment in stream:
+        segments.append(segment)
+        if settings.TRANSCRIPTION_STREAMING:
+            job.publish(
+                TranscriptionEvent(type=TranscriptionEventType.segment, text=segment)
+            )
+    return " ".join(segments)
 
 
 class TranslationException(Exception):
@@ -40,53 +484,301 @@ class TranslationException(Exception):
     pass
 
 
-def translate(text: str, target_language: str) -> str:
+def translation_cache() -> TieredCache:
+    """
+    Retrieve the translation cache, creating it on first use.
+
+    :return: TieredCache
+    """
+    global _translation_cache
+    if _translation_cache is None:
+        _translation_cache = TieredCache(
+            max_items=settings.TRANSLATION_CACHE_ITEMS,
+            path=os.path.join(settings.UPLOAD_PATH, "cache", "translations"),
+            max_bytes=settings.TRANSLATION_CACHE_MAX_BYTES,
+        )
+    return _translation_cache
+
+
+def backend_name(target_language: str) -> str:
+    """
+    The name of the backend that translates into a language,
+    as chosen by the TRANSLATION_BACKEND and TRANSLATION_BACKENDS settings.
+
+    :param target_language: the language code to translate into
+    :return: pseudo | deepl | marian
+    """
+    if settings.PSEUDO_TRANSLATE:
+        return PseudoBackend.name
+    return settings.TRANSLATION_BACKENDS.get(
+        target_language, settings.TRANSLATION_BACKEND
+    )
+
+
+def translation_backend(target_language: str) -> TranslationBackend:
     """
-    Translate text into a target language
+    Retrieve the backend that translates into a language, creating it on first use.
+
+    :param target_language: the language code to translate into
+    :return: TranslationBackend
+    """
+    name = backend_name(target_language)
+    if name not in BACKENDS:
+        raise ValueError(f"unknown translation backend: {name}")
+    if name == DeepLBackend.name:
+        # the DeepL client belongs to the running event loop
+        return DeepLBackend(_get_translator())
+    if name not in _backends:
+        _backends[name] = BACKENDS[name](**_backend_options(name))
+    return _backends[name]
+
+
+def _backend_options(name: str) -> dict:
+    if name == MarianBackend.name:
+        return {
+            "models": settings.MARIAN_MODELS,
+            "batch_size": settings.MARIAN_BATCH_SIZE,
+        }
+    return {}
+
+
+def translation_key(text: str, target_language: str, backend_tag: str) -> str:
+    """
+    Build the cache key of a translation from the source text,
+    the languages and every option that changes the output.
+
+    :param text: the text to translate
+    :param target_language: the language code to translate into
+    :param backend_tag: identifies the backend and its model
+    :return: cache key
+    """
+    return digest(
+        digest(text),
+        settings.SOURCE_LANGUAGE,
+        target_language,
+        f"backend={backend_tag}&tag_handling=html",
+    )
+
+
+async def translate(text: str, target_language: str) -> str:
+    """
+    Translate text into a target language.
+    The text is translated paragraph by paragraph and each paragraph is cached,
+    so a republished message only sends the edited paragraphs to the backend,
+    in a single batch. Identical requests made at the same time share
+    that batch.
+
     :param text: the text to translate
     :param target_language: the language code to translate into
     :return: the translated text
     """
     try:
-        if settings.PSEUDO_TRANSLATE:
-            return _pseudo_translation(text)
-
-        source_code = settings.SOURCE_LANGUAGE.upper()
-        if target_language == "en":
-            target_code = "EN-US"
-        elif target_language == "pt":
-            target_code = "PT-BR"
-        else:
-            target_code = target_language.upper()
-
-        return _translator.translate_text(
-            text, target_lang=target_code, source_lang=source_code, tag_handling="html"
-        ).text
+        backend = translation_backend(target_language)
+        if not backend.cached:
+            translated = await backend.translate(
+                [text], settings.SOURCE_LANGUAGE, target_language
+            )
+            return translated[0]
+
+        tag = backend.cache_tag(target_language)
+        parts = segments.split(text)
+        translated = await asyncio.to_thread(
+            _cached_translations, parts, target_language, tag
+        )
+        missing = [part for part, cached in translated.items() if cached is None]
+
+        if missing:
+            results = await _translation_flights.do(
+                digest(tag, target_language, *missing),
+                lambda: _translate_uncached(backend, missing, target_language),
+            )
+            translated.update(zip(missing, results))
+
+        return "".join(translated.get(part) or part for part in parts)
     except Exception as err:
         logging.warning("could not translate text: {}".format(err))
         raise TranslationException(err)
 
 
-def _pseudo_translation(text: str) -> str:
+async def _translate_uncached(
+    backend: TranslationBackend, parts: List[str], target_language: str
+) -> List[str]:
+    """
+    Translate segments that are not cached yet and cache them.
+
+    :param backend: the backend translating into the language
+    :param parts: the segments to translate
+    :param target_language: the language code to translate into
+    :return: the translated segments, in order
+    """
+    results = await backend.translate(parts, settings.SOURCE_LANGUAGE, target_language)
+    await asyncio.to_thread(
+        _cache_translations,
+        dict(zip(parts, results)),
+        target_language,
+        backend.cache_tag(target_language),
+    )
+    return results
+
+
+def _cached_translations(
+    parts: List[str], target_language: str, backend_tag: str
+) -> Dict[str, Optional[str]]:
+    """
+    Look up the cached translations of the segments of a text
+
+    :param parts: the segments of the text
+    :param target_language: the language code to translate into
+    :param backend_tag: identifies the backend and its model
+    :return: the cached translation or None by segment, blank segments excluded
+    """
+    cache = translation_cache()
+    return {
+        part: cache.get(translation_key(part, target_language, backend_tag))
+        for part in parts
+        if not segments.is_blank(part)
+    }
+
+
+def _cache_translations(
+    translations: Dict[str, str], target_language: str, backend_tag: str
+):
+    """
+    Store the translations of the segments of a text
+
+    :param translations: the translation by segment
+    :param target_language: the language code translated into
+    :param backend_tag: identifies the backend and its model
+    :return: None
+    """
+    cache = translation_cache()
+    for part, translated in translations.items():
+        cache.set(translation_key(part, target_language, backend_tag), translated)
+
+
+async def translate_all(text: str, target_languages: List[str]) -> Dict[str, str]:
     """
-    Perform a fake translation. Used for development to reduce DeepL API calls.
+    Translate text into several languages concurrently,
+    so the total time is that of the slowest translation.
 
     :param text: the text to translate
-    :return: altered text
+    :param target_languages: the language codes to translate into
+    :return: the translated text by language code
     """
-    # This regex is split into two capture groups to handle xml tags differently.
-    # <[^>]+> captures xml tags into the tag group
-    # [^<]+ captures everything else into the text group
-    return re.sub(r"(?P<tag><[^>]+>)|(?P<text>[^<]+)", _pseudo_replace, text)
+
+    async def translate_one(target_language: str) -> str:
+        try:
+            return await asyncio.wait_for(
+                translate(text, target_language),
+                settings.TRANSLATION_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError as err:
+            logging.warning(f"translation to {target_language} timed out")
+            raise TranslationException(f"translation timed out: {err}") from err
+
+    translations = await asyncio.gather(
+        *[translate_one(language) for language in target_languages]
+    )
+    return dict(zip(target_languages, translations))
+
+
+def pretranslate(key: str, text: str):
+    """
+    Translate text into every target language in the background,
+    so the translations are cached by the time the message is published.
+    While a text is being translated, only the latest text sent for the same key
+    is kept and translated next.
+
+    :param key: identifies the message being edited
+    :param text: the current text of the message
+    :return: None
+    """
+    if key in _pretranslations:
+        _pretranslations[key] = text
+        return
+
+    _pretranslations[key] = None
+    task = asyncio.create_task(_pretranslate(key, text))
+    _pretranslation_tasks.add(task)
+    task.add_done_callback(_pretranslation_tasks.discard)
+
+
+async def _pretranslate(key: str, text: Optional[str]):
+    try:
+        while text is not None:
+            try:
+                await translate_all(text, settings.TARGET_LANGUAGES)
+            except TranslationException as err:
+                logging.info(f"pre-translation failed: {err}")
+            text = _pretranslations[key]
+            _pretranslations[key] = None
+    finally:
+        del _pretranslations[key]
+
+
+def _get_translator() -> DeepLClient:
+    """
+    Retrieve the DeepL client, creating it on first use.
+
+    :return: DeepLClient
+    """
+    global _translator, _translator_loop
+    loop = asyncio.get_running_loop()
+    if _translator is None or _translator_loop is not loop:
+        _translator = DeepLClient(
+            settings.DEEPL_API_KEY,
+            server_url=settings.DEEPL_SERVER_URL,
+            timeout=settings.DEEPL_TIMEOUT_SECONDS,
+            max_connections=settings.DEEPL_MAX_CONNECTIONS,
+            requests_per_second=settings.DEEPL_REQUESTS_PER_SECOND,
+            characters_per_minute=settings.DEEPL_CHARACTERS_PER_MINUTE,
+            max_retries=settings.DEEPL_MAX_RETRIES,
+        )
+        _translator_loop = loop
+    return _translator
+
+
+async def translation_usage() -> TranslationUsage:
+    """
+    Retrieve the character usage of the DeepL account
+    and the translation activity of this server.
+
+    :return: TranslationUsage
+    """
+    cache = translation_cache()
+    backends = {backend_name(lang) for lang in settings.TARGET_LANGUAGES}
+    if DeepLBackend.name not in backends:
+        return TranslationUsage(
+            character_count=0, cache_hits=cache.hits, cache_misses=cache.misses
+        )
+
+    translator = _get_translator()
+    try:
+        usage = await translator.usage()
+    except DeepLError as err:
+        logging.warning(f"could not read DeepL usage: {err}")
+        raise TranslationException(err) from err
+
+    return TranslationUsage(
+        character_count=usage.character_count,
+        character_limit=usage.character_limit,
+        characters_sent=translator.characters_sent,
+        cache_hits=cache.hits,
+        cache_misses=cache.misses,
+    )
 
 
-def _pseudo_replace(m):
+async def close_translator():
     """
-    Uppercase regex matched text groups
-    :param m: regex matched text
-    :return: uppercase text or original group if not text
+    Close the translation backends and the connections of the DeepL client.
+    :return: None
     """
-    g = m.group("text")
-    if g is None:
-        return m.group()
-    return g.upper()
+    global _translator, _translator_loop
+    backends = list(_backends.values())
+    _backends.clear()
+    for backend in backends:
+        await backend.aclose()
+    if _translator is not None:
+        await _translator.aclose()
+        _translator = None
+        _translator_loop = None
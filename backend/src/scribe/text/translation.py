@@ -0,0 +1,415 @@
+"""
+This module provides the machine translation backends.
+
+pseudo: uppercases the text, for development without translation costs.
+deepl: the DeepL API, the most accurate, paid per character.
+marian: Marian (Opus-MT) models running locally on the CPU, with no network
+    round trip or per character cost. It is an optional dependency,
+    installed with the marian extra.
+"""
+import asyncio
+import html
+import importlib.util
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from scribe.text.translator import DeepLClient
+
+# splits HTML into tags and the text between them
+_TAGS = re.compile(r"(?P<tag><[^>]+>)|(?P<text>[^<]+)")
+
+# tags that format text within a sentence, rather than separating sentences
+_INLINE_TAGS = {
+    "a",
+    "abbr",
+    "b",
+    "br",
+    "code",
+    "del",
+    "em",
+    "i",
+    "ins",
+    "mark",
+    "q",
+    "s",
+    "small",
+    "span",
+    "strong",
+    "sub",
+    "sup",
+    "u",
+}
+
+_TAG_NAME = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)")
+
+# stands in for the inline tag with the same number while a sentence is translated
+_MARKER = re.compile(r"<x(\d+)>")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class TranslationBackend(ABC):
+    """
+    This class defines the interface of a translation backend.
+    """
+
+    name = ""
+
+    # whether translations are worth caching
+    cached = True
+
+    @abstractmethod
+    async def translate(
+        self, texts: List[str], source_language: str, target_language: str
+    ) -> List[str]:
+        """
+        Translate HTML texts in a single batch
+
+        :param texts: the HTML texts to translate
+        :param source_language: the language code of the texts, such as en
+        :param target_language: the language code to translate into
+        :return: the translated texts, in order
+        """
+        pass
+
+    def cache_tag(self, target_language: str) -> str:
+        """
+        Identify the translations of this backend in cache keys
+
+        :param target_language: the language code to translate into
+        :return: a tag that changes whenever the output would
+        """
+        return self.name
+
+    async def aclose(self):
+        """
+        Release the resources of the backend
+        :return: None
+        """
+        pass
+
+
+class PseudoBackend(TranslationBackend):
+    """
+    This class performs a fake translation, leaving tags untouched.
+    Used for development to reduce DeepL API calls.
+    """
+
+    name = "pseudo"
+    cached = False
+
+    async def translate(
+        self, texts: List[str], source_language: str, target_language: str
+    ) -> List[str]:
+        return [_TAGS.sub(_pseudo_replace, text) for text in texts]
+
+
+def _pseudo_replace(m):
+    """
+    Uppercase regex matched text groups
+    :param m: regex matched text
+    :return: uppercase text or original group if not text
+    """
+    g = m.group("text")
+    if g is None:
+        return m.group()
+    return g.upper()
+
+
+class DeepLBackend(TranslationBackend):
+    """
+    This class translates with the DeepL API.
+    """
+
+    name = "deepl"
+
+    def __init__(self, client: DeepLClient):
+        """
+        Initializes the backend
+
+        :param client: the DeepL client, owning the pooled connections
+        """
+        self.client = client
+
+    async def translate(
+        self, texts: List[str], source_language: str, target_language: str
+    ) -> List[str]:
+        if target_language == "en":
+            target_code = "EN-US"
+        elif target_language == "pt":
+            target_code = "PT-BR"
+        else:
+            target_code = target_language.upper()
+
+        return await self.client.translate(
+            texts,
+            target_lang=target_code,
+            source_lang=source_language.upper(),
+            tag_handling="html",
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class MarianBackend(TranslationBackend):
+    """
+    This class translates with Marian models on the CPU.
+    A model is loaded once per language pair and kept for the life of the process.
+    Marian models translate plain text, so the text of each block is translated
+    whole, with its inline tags replaced by markers that are put back afterwards.
+    Texts longer than the model accepts are translated sentence by sentence.
+    """
+
+    name = "marian"
+
+    def __init__(
+        self,
+        models: Optional[Dict[str, str]] = None,
+        model_template: str = "Helsinki-NLP/opus-mt-{source}-{target}",
+        batch_size: int = 16,
+    ):
+        """
+        Initializes the backend
+
+        :param models: the model name by target language, overriding the template
+        :param model_template: the model name of a language pair
+        :param batch_size: the number of texts translated together
+        """
+        # transformers is only imported once a model loads, since it imports slowly
+        if importlib.util.find_spec("transformers") is None:
+            raise RuntimeError(
+                "the marian translation backend needs the marian extra: "
+                "poetry install --extras marian"
+            )
+
+        self.models = models or {}
+        self.model_template = model_template
+        self.batch_size = batch_size
+        self._loaded: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def model_name(self, source_language: str, target_language: str) -> str:
+        """
+        The name of the model translating a language pair
+
+        :param source_language: the language code translated from
+        :param target_language: the language code translated into
+        :return: the Hugging Face model name
+        """
+        return self.models.get(
+            target_language,
+            self.model_template.format(source=source_language, target=target_language),
+        )
+
+    def cache_tag(self, target_language: str) -> str:
+        return f"{self.name}:{self.models.get(target_language, self.model_template)}"
+
+    async def translate(
+        self, texts: List[str], source_language: str, target_language: str
+    ) -> List[str]:
+        model = self.model_name(source_language, target_language)
+        # inference is CPU bound and blocking, like transcription
+        return await asyncio.to_thread(self._translate_html, texts, model)
+
+    def _translate_html(self, texts: List[str], model: str) -> List[str]:
+        """
+        Translate the runs of text between block tags of every text in batches
+
+        :param texts: the HTML texts to translate
+        :param model: the model name
+        :return: the translated texts, in order
+        """
+        parts = [_split_runs(text) for text in texts]
+        runs = [part for text_parts in parts for part in text_parts if _is_run(part)]
+        translated = iter(self._translate_plain([run[0] for run in runs], model))
+
+        results = []
+        for text_parts in parts:
+            out = []
+            for part in text_parts:
+                if not _is_run(part):
+                    out.append(part)
+                    continue
+                source, tags, leading, trailing = part
+                restored = _restore(next(translated), source, tags)
+                out.append(f"{leading}{restored}{trailing}")
+            results.append("".join(out))
+        return results
+
+    def _translate_plain(self, sentences: List[str], model: str) -> List[str]:
+        """
+        Translate plain text with a Marian model
+
+        :param sentences: the texts to translate
+        :param model: the model name
+        :return: the translated texts, in order
+        """
+        tokenizer, marian = self._load(model)
+        pieces = [self._pieces(sentence, tokenizer) for sentence in sentences]
+        inputs = [piece for sentence in pieces for piece in sentence]
+        outputs = []
+        for start in range(0, len(inputs), self.batch_size):
+            batch = inputs[start : start + self.batch_size]
+            tokens = tokenizer(batch, return_tensors="pt", padding=True)
+            generated = marian.generate(**tokens)
+            outputs += tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+        translated = iter(outputs)
+        return [" ".join(next(translated) for _ in sentence) for sentence in pieces]
+
+    @staticmethod
+    def _pieces(text: str, tokenizer) -> List[str]:
+        """
+        Split a text that is too long for the model into sentences,
+        and sentences that are still too long into words,
+        grouped into pieces the model accepts whole.
+
+        :param text: the text to translate
+        :param tokenizer: the tokenizer of the model
+        :return: the pieces, in order
+        """
+        # leave room for the end of sequence token
+        limit = tokenizer.model_max_length - 1
+        if len(tokenizer.tokenize(text)) <= limit:
+            return [text]
+
+        units = []
+        for sentence in _SENTENCE_END.split(text):
+            if len(tokenizer.tokenize(sentence)) <= limit:
+                units.append(sentence)
+            else:
+                units += sentence.split()
+
+        pieces = [units[0]]
+        for unit in units[1:]:
+            joined = f"{pieces[-1]} {unit}"
+            if len(tokenizer.tokenize(joined)) <= limit:
+                pieces[-1] = joined
+            else:
+                pieces.append(unit)
+        return pieces
+
+    def _load(self, model: str):
+        """
+        Retrieve a model and its tokenizer, loading them on first use.
+
+        :param model: the model name
+        :return: (tokenizer, model)
+        """
+        with self._lock:
+            if model not in self._loaded:
+                from transformers import MarianMTModel, MarianTokenizer
+
+                self._loaded[model] = (
+                    MarianTokenizer.from_pretrained(model),
+                    MarianMTModel.from_pretrained(model).eval(),
+                )
+            return self._loaded[model]
+
+
+def _is_inline(tag: str) -> bool:
+    name = _TAG_NAME.match(tag)
+    return name is not None and name.group(2).lower() in _INLINE_TAGS
+
+
+def _is_run(part) -> bool:
+    return isinstance(part, tuple)
+
+
+def _split_runs(text: str) -> list:
+    """
+    Split HTML at its block tags into runs of text to translate as a whole
+
+    :param text: the HTML text
+    :return: the block tags and blank runs as strings, and each run to translate as
+        (the run with markers for its inline tags, the inline tags,
+        its leading whitespace, its trailing whitespace)
+    """
+    parts = []
+    run = []
+
+    def end_run():
+        if any(m.group("text") and m.group("text").strip() for m in run):
+            tags = []
+            source = ""
+            for m in run:
+                if m.group("tag"):
+                    source += f"<x{len(tags)}>"
+                    tags.append(m.group("tag"))
+                else:
+                    source += html.unescape(m.group("text"))
+            stripped = source.strip()
+            leading = source[: len(source) - len(source.lstrip())]
+            trailing = source[len(source.rstrip()) :]
+            parts.append((stripped, tags, leading, trailing))
+        else:
+            parts.extend(m.group() for m in run)
+        run.clear()
+
+    for m in _TAGS.finditer(text):
+        if m.group("tag") and not _is_inline(m.group("tag")):
+            end_run()
+            parts.append(m.group())
+        else:
+            run.append(m)
+    end_run()
+    return parts
+
+
+def _restore(translated: str, source: str, tags: List[str]) -> str:
+    """
+    Put the inline tags back in place of their markers in a translation.
+    When the model dropped, repeated or misnested markers, the tags around
+    the text keep their place and the tags within it follow the text.
+
+    :param translated: the translated run with markers
+    :param source: the run with markers that was translated
+    :param tags: the inline tags of the run, by marker number
+    :return: the translated HTML
+    """
+    pieces = _MARKER.split(translated)
+    order = [int(number) for number in pieces[1::2]]
+    if sorted(order) == list(range(len(tags))) and (
+        order == sorted(order) or _nested([tags[number] for number in order])
+    ):
+        out = html.escape(pieces[0], False)
+        for number, text in zip(order, pieces[2::2]):
+            out += tags[number] + html.escape(text, False)
+        return out
+
+    original = _MARKER.split(source)
+    numbers = [int(number) for number in original[1::2]]
+    first = next(i for i, text in enumerate(original[::2]) if text.strip())
+    text = html.escape(" ".join(_MARKER.sub(" ", translated).split()), False)
+    before = "".join(tags[number] for number in numbers[:first])
+    after = "".join(tags[number] for number in numbers[first:])
+    return f"{before}{text}{after}"
+
+
+def _nested(tags: List[str]) -> bool:
+    """
+    Check that every closing tag closes the last tag opened
+
+    :param tags: the tags in order
+    :return: True if the tags nest
+    """
+    opened = []
+    for tag in tags:
+        closing, name = _TAG_NAME.match(tag).groups()
+        if name.lower() == "br" or tag.endswith("/>"):
+            continue
+        if not closing:
+            opened.append(name.lower())
+        elif not opened or opened.pop() != name.lower():
+            return False
+    return not opened
+
+
+BACKENDS = {
+    PseudoBackend.name: PseudoBackend,
+    DeepLBackend.name: DeepLBackend,
+    MarianBackend.name: MarianBackend,
+}
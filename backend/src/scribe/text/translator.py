@@ -0,0 +1,240 @@
+"""
+This module provides an asynchronous DeepL client.
+
+The client keeps a pool of persistent connections to the DeepL API, so
+translations neither block the event loop nor pay for a new TLS handshake
+on every request. HTTP/2 is used when the h2 package is installed.
+
+Requests are spaced out by token buckets for requests per second and characters
+per minute, and requests DeepL throttles are retried with jittered exponential
+backoff, waiting at least as long as its Retry-After header asks. Under load,
+translations slow down instead of failing.
+"""
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from typing import List, NamedTuple, Optional
+
+import httpx
+
+FREE_SERVER_URL = "https://api-free.deepl.com"
+
+PRO_SERVER_URL = "https://api.deepl.com"
+
+# 429: too many requests, 503: temporarily unavailable
+RETRY_STATUS_CODES = {429, 503}
+
+# the longest backoff between retries, in seconds
+MAX_BACKOFF = 30.0
+
+
+class DeepLError(Exception):
+    """
+    This exception indicates that the DeepL API rejected a request
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Usage(NamedTuple):
+    """
+    The characters translated in the current billing period
+    """
+
+    character_count: int
+    character_limit: int
+
+
+class TokenBucket:
+    """
+    This class limits the rate of an activity.
+    Tokens refill at a steady rate up to the capacity of the bucket,
+    and callers wait until there are enough tokens for them.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initializes the bucket full
+
+        :param rate: the tokens added per second
+        :param capacity: the most tokens the bucket holds, which is the largest burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        """
+        Wait until the tokens are available and take them.
+        Callers are served in order, so a large request is not starved by small ones.
+
+        :param amount: the tokens needed, capped at the capacity
+        :return: None
+        """
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            if self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class DeepLClient:
+    """
+    This class translates text with the DeepL API over pooled connections.
+    """
+
+    def __init__(
+        self,
+        auth_key: str,
+        server_url: str = "",
+        timeout: float = 10.0,
+        max_connections: int = 8,
+        requests_per_second: float = 5.0,
+        characters_per_minute: int = 100_000,
+        max_retries: int = 4,
+    ):
+        """
+        Initializes the client
+
+        :param auth_key: the DeepL authentication key
+        :param server_url: the API address, chosen from the key type if empty
+        :param timeout: the time allowed to connect, send, wait and read, in seconds
+        :param max_connections: the number of requests sent at once
+        :param requests_per_second: the sustained rate of requests
+        :param characters_per_minute: the sustained rate of characters translated
+        :param max_retries: how often a throttled or failed request is sent again
+        """
+        self.max_retries = max_retries
+        self.characters_sent = 0
+        self._requests = TokenBucket(requests_per_second, max(requests_per_second, 1))
+        self._characters = TokenBucket(
+            characters_per_minute / 60, characters_per_minute
+        )
+        if not server_url:
+            # keys of the free API end with :fx
+            server_url = FREE_SERVER_URL if auth_key.endswith(":fx") else PRO_SERVER_URL
+
+        self._client = httpx.AsyncClient(
+            base_url=server_url,
+            headers={"Authorization": f"DeepL-Auth-Key {auth_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+
+    async def translate(
+        self,
+        texts: List[str],
+        target_lang: str,
+        source_lang: Optional[str] = None,
+        tag_handling: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Translate several texts in one request
+
+        :param texts: the texts to translate
+        :param target_lang: the DeepL target language code, such as ES or PT-BR
+        :param source_lang: the DeepL source language code, detected if None
+        :param tag_handling: html | xml, to translate marked up text
+        :return: the translated texts, in order
+        """
+        payload = {"text": texts, "target_lang": target_lang}
+        if source_lang:
+            payload["source_lang"] = source_lang
+        if tag_handling:
+            payload["tag_handling"] = tag_handling
+
+        characters = sum(len(text) for text in texts)
+        await self._characters.acquire(characters)
+        response = await self._request("POST", "/v2/translate", json=payload)
+        self.characters_sent += characters
+        return [t["text"] for t in response.json()["translations"]]
+
+    async def usage(self) -> Usage:
+        """
+        Retrieve the character usage of the account
+
+        :return: Usage
+        """
+        response = await self._request("GET", "/v2/usage")
+        body = response.json()
+        return Usage(body["character_count"], body["character_limit"])
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying when DeepL throttles it or cannot be reached.
+
+        :param method: the HTTP method
+        :param path: the API path
+        :param kwargs: the arguments of httpx.AsyncClient.request
+        :return: the successful response
+        """
+        attempt = 0
+        while True:
+            await self._requests.acquire()
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except httpx.TransportError as err:
+                if attempt >= self.max_retries:
+                    raise DeepLError(f"DeepL request failed: {err!r}") from err
+                retry_after = None
+            else:
+                if response.status_code == 200:
+                    return response
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    raise DeepLError(
+                        f"DeepL responded {response.status_code}: {response.text}",
+                        response.status_code,
+                    )
+                retry_after = response.headers.get("Retry-After")
+
+            delay = _backoff(attempt, retry_after)
+            logging.info(f"retrying DeepL request in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        """
+        Close the pooled connections
+        :return: None
+        """
+        await self._client.aclose()
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    The time to wait before sending a request again.
+    The exponential backoff is fully jittered, so clients throttled together
+    do not retry together.
+
+    :param attempt: the number of retries so far
+    :param retry_after: the Retry-After header of the response, in seconds
+    :return: the delay in seconds
+    """
+    delay = random.uniform(0, min(MAX_BACKOFF, 0.5 * 2**attempt))
+    try:
+        return max(delay, float(retry_after))
+    except (TypeError, ValueError):
+        # missing, or an HTTP date, which DeepL does not send
+        return delay
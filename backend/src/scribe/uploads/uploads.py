@@ -0,0 +1,147 @@
+"""
+This module saves uploaded files without holding them in memory.
+
+Uploads are streamed to disk in chunks, off the event loop, and hashed as they
+are written. The audio format is detected from the first bytes of the file
+rather than the content type sent by the browser. The request body size is
+limited by a middleware, before the multipart parser spools it.
+"""
+import asyncio
+import hashlib
+import os
+from typing import NamedTuple, Optional
+
+from fastapi import UploadFile
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from scribe.exceptions import InvalidAudioException, UploadTooLargeException
+
+CHUNK_BYTES = 1_048_576
+
+# audio formats by the magic bytes at the start of the file
+_SIGNATURES = [
+    (b"OggS", "audio/ogg", ".ogg"),
+    (b"fLaC", "audio/flac", ".flac"),
+    (b"ID3", "audio/mpeg", ".mp3"),
+    # browsers without ogg recording label their webm recordings as ogg
+    (b"\x1a\x45\xdf\xa3", "audio/webm", ".webm"),
+]
+
+
+class StoredUpload(NamedTuple):
+    file_path: str
+    mime_type: str
+    size: int
+    sha256: str
+
+
+def sniff(header: bytes) -> Optional[tuple[str, str]]:
+    """
+    Detect the audio format from the first bytes of a file
+
+    :param header: at least the first 12 bytes of the file
+    :return: the mime type and file extension, or None if not supported
+    """
+    for magic, mime_type, extension in _SIGNATURES:
+        if header.startswith(magic):
+            return mime_type, extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "audio/wav", ".wav"
+    # mpeg audio frames without an ID3 tag start with an 11 bit frame sync
+    if len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return "audio/mpeg", ".mp3"
+    return None
+
+
+async def save(
+    upload: UploadFile, directory: str, name: str, max_bytes: int
+) -> StoredUpload:
+    """
+    Stream an uploaded audio file to disk in chunks, hashing it on the way.
+
+    :param upload: the uploaded file
+    :param directory: the folder to save the file in
+    :param name: the file name, the extension is added from the detected format
+    :param max_bytes: the largest file accepted
+    :return: StoredUpload
+    """
+    chunk = await upload.read(CHUNK_BYTES)
+    detected = sniff(chunk)
+    if detected is None:
+        raise InvalidAudioException(f"unsupported audio format: {chunk[:12]!r}")
+
+    mime_type, extension = detected
+    file_path = os.path.join(directory, f"{name}{extension}")
+    sha = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeException(f"upload exceeds {max_bytes} bytes")
+            sha.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+            chunk = await upload.read(CHUNK_BYTES)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.unlink, file_path)
+        raise
+    await asyncio.to_thread(f.close)
+
+    return StoredUpload(file_path, mime_type, size, sha.hexdigest())
+
+
+class MaxBodySizeMiddleware:
+    """
+    This middleware rejects requests with a body larger than the limit,
+    checking the Content-Length header up front and counting streamed bytes.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        """
+        Initializes the middleware
+
+        :param app: the ASGI app to wrap
+        :param max_bytes: the largest request body accepted
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_bytes:
+                await _send_too_large(send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_too_large(send: Send):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"Request Entity Too Large"})
@@ -1,3 +1,4 @@
+import asyncio
 import secrets
 
 import pytest
@@ -6,6 +7,7 @@ from starlette.datastructures import Headers
 from starlette.requests import Request
 
 import scribe.dependencies
+import scribe.slack.directory
 import scribe.slack.slack
 from scribe.main import app
 from scribe.models.models import Channel, Team, User
@@ -52,6 +54,9 @@ def global_mocks(mocker):
     mocker.patch.object(scribe.dependencies, "session_store", _session_store)
     mocker.patch.object(scribe.slack.slack, "access_token", mocks.mock_access_token)
     mocker.patch.object(scribe.slack.slack, "SlackClient", mocks.MockSlackClient)
+    mocker.patch.object(
+        scribe.slack.slack, "AsyncSlackClient", mocks.MockAsyncSlackClient
+    )
 
 
 @pytest.fixture()
@@ -119,9 +124,12 @@ def empty_session(session_store):
 @pytest.fixture()
 def user_session(empty_session, user, channels):
     token = "123456"
+    mocks.token_resources[token] = {"user": user, "channels": channels}
     empty_session.set("access_token", token)
     empty_session.set("user", user)
-    empty_session.set("channels", channels)
+    client = mocks.MockAsyncSlackClient(token)
+    asyncio.run(scribe.slack.directory.workspace_directory().channels(client))
+    empty_session.set("channel_ids", [channel.id for channel in channels])
 
     return empty_session
 
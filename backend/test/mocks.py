@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from slack_sdk.web import SlackResponse
 
@@ -56,3 +56,20 @@ class MockSlackClient:
 
     def publish(self, html: str, target: str, pin_to_channel: bool) -> None:
         pass
+
+
+class MockAsyncSlackClient(MockSlackClient):
+    async def user(self) -> User:
+        return super().user()
+
+    async def team(self) -> Team:
+        return super().team()
+
+    async def users(self) -> Dict[str, User]:
+        return {}
+
+    async def conversations(self) -> List[dict]:
+        return [{"id": c.id, "name": c.name} for c in super().channels()]
+
+    async def channels(self) -> List[Channel]:
+        return super().channels()
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+from scribe.audio import audio
+
+
+@pytest.fixture
+def pcm_file(tmp_path):
+    samples = np.arange(3 * audio.SAMPLE_RATE, dtype=np.int16)
+    path = str(tmp_path / "recording.npy")
+    np.save(path, samples)
+    return path
+
+
+def test_duration(pcm_file):
+    assert audio.duration(pcm_file) == 3
+
+
+def test_load_window(pcm_file):
+    window = audio.load(pcm_file, 1, 2)
+    assert window.dtype == np.float32
+    assert len(window) == audio.SAMPLE_RATE
+    assert window[0] == audio.SAMPLE_RATE / 32768.0
+
+
+def test_load_whole_file(pcm_file):
+    assert len(audio.load(pcm_file)) == 3 * audio.SAMPLE_RATE
+
+
+def test_preprocess(mocker, tmp_path):
+    samples = np.zeros(audio.SAMPLE_RATE // 2, dtype=np.int16)
+    mocker.patch.object(audio, "decode", return_value=samples)
+    upload = str(tmp_path / "recording.ogg")
+
+    pcm_path, duration = audio.preprocess(upload)
+    assert pcm_path == str(tmp_path / "recording.npy")
+    assert duration == 0.5
+    assert os.listdir(tmp_path) == ["recording.npy"]
+    assert audio.is_pcm(pcm_path)
+    assert np.array_equal(np.load(pcm_path), samples)
+
+
+def test_pcm_writer(tmp_path):
+    path = str(tmp_path / "recording.npy")
+    writer = audio.PcmWriter(path)
+    assert audio.duration(path) == 0
+    writer.append(np.arange(audio.SAMPLE_RATE, dtype=np.int16))
+    assert audio.duration(path) == 1
+    writer.append(np.arange(audio.SAMPLE_RATE, dtype=np.int16))
+    writer.close()
+    assert audio.duration(path) == 2
+    assert len(audio.load(path, 1.5)) == audio.SAMPLE_RATE // 2
+
+
+def test_stream_decoder(mocker):
+    # cat stands in for ffmpeg, passing the PCM through
+    mocker.patch.object(audio, "_stream_command", return_value=["cat"])
+    decoder = audio.StreamDecoder()
+    samples = np.arange(1_000, dtype=np.int16)
+    decoder.write(samples[:500].tobytes())
+    decoder.write(samples[500:].tobytes())
+    decoded = np.concatenate([decoder.read(), decoder.close()])
+    assert np.array_equal(decoded, samples)
+
+
+def test_stream_decoder_failure(mocker):
+    mocker.patch.object(
+        audio,
+        "_stream_command",
+        return_value=["sh", "-c", "echo bad audio >&2; exit 1"],
+    )
+    decoder = audio.StreamDecoder()
+    decoder.write(b"not audio")
+    with pytest.raises(RuntimeError, match="bad audio"):
+        decoder.close()
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+
+from scribe.cache.cache import DiskCache, LRUCache, SingleFlight, TieredCache, digest
+
+
+def test_digest():
+    assert digest("a", "b") == digest("a", "b")
+    assert digest("a", "b") != digest("ab")
+
+
+def test_lru_eviction():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_disk_cache(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1_000)
+    key = digest("recording")
+    assert cache.get(key) is None
+    cache.set(key, "This is a test recording.")
+    assert DiskCache(str(tmp_path), max_bytes=1_000).get(key) == (
+        "This is a test recording."
+    )
+
+
+def test_disk_cache_size_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=250)
+    keys = [digest(str(i)) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.set(key, "x" * 50)
+        past = time.time() - 100 + i
+        os.utime(cache._file(key), (past, past))
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[-1]) == "x" * 50
+
+
+def test_tiered_cache_counts_and_promotes(tmp_path):
+    cache = TieredCache(max_items=1, path=str(tmp_path), max_bytes=1_000)
+    cache.set("a", "first")
+    cache.set("b", "second")
+    assert cache.memory.get("a") is None
+    assert cache.get("a") == "first"
+    assert cache.memory.get("a") == "first"
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_single_flight_shares_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        results = await asyncio.gather(*[flights.do("key", call) for _ in range(5)])
+        return results, await flights.do("key", call)
+
+    results, later = asyncio.run(run())
+    assert results == ["result"] * 5
+    assert later == "result"
+    # a call made after the first one finished runs again
+    assert len(calls) == 2
+
+
+def test_single_flight_shares_errors():
+    flights = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def run():
+        return await asyncio.gather(
+            flights.do("key", call), flights.do("key", call), return_exceptions=True
+        )
+
+    errors = asyncio.run(run())
+    assert all(isinstance(err, ValueError) for err in errors)
+    assert flights.in_flight == 0
+
+
+def test_single_flight_survives_cancelled_caller():
+    flights = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        impatient = asyncio.create_task(flights.do("key", call))
+        patient = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == "result"
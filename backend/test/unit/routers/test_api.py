@@ -0,0 +1,21 @@
+from scribe.models.models import TranslationUsage
+from scribe.text import text
+from scribe.text.text import TranslationException
+
+
+def test_translation_usage(mocker, api_client, user_session):
+    usage = TranslationUsage(character_count=1_200, character_limit=500_000)
+    mocker.patch.object(text, "translation_usage", return_value=usage)
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    response = api_client.get("/api/translation/usage")
+    assert response.status_code == 200
+    assert response.json()["character_limit"] == 500_000
+
+
+def test_translation_usage_unavailable(mocker, api_client, user_session):
+    mocker.patch.object(
+        text, "translation_usage", side_effect=TranslationException("offline")
+    )
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    response = api_client.get("/api/translation/usage")
+    assert response.status_code == 502
@@ -1,5 +1,19 @@
+import pytest
+from sse_starlette.sse import AppStatus
+from starlette.websockets import WebSocketDisconnect
+
 import scribe
-from scribe.models.models import Recording, User
+from scribe.config.settings import settings
+from scribe.models.models import Recording, TranscriptionEvent, User
+from scribe.text import text
+from scribe.text.scheduler import TranscriptionJob
+
+
+@pytest.fixture(autouse=True)
+def sse_exit_event():
+    # sse-starlette binds its exit event to the event loop of the first response,
+    # and each TestClient request runs in a new loop
+    AppStatus.should_exit_event = None
 
 
 def test_redirect_to_login(api_client):
@@ -44,6 +58,8 @@ def test_login_flow(api_client, empty_session, oauth_code):
     assert response.status_code == 200
     assert response.url.path == "/"
     assert isinstance(empty_session.get("user"), User)
+    assert empty_session.get("channel_ids") == ["C1234"]
+    assert empty_session.get("direct_messages") == {}
 
 
 def test_upload_invalid_file(api_client, user_session):
@@ -67,6 +83,40 @@ def test_upload_audio_file(api_client, user_session):
         assert "Processing audio..." in response.text
 
 
+def test_upload_starts_transcription(mocker, api_client, user_session):
+    submit = mocker.patch.object(text, "submit_transcription")
+    audio = scribe.path_from_root("../test/resources/voice_recording.ogg")
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    with open(audio, "rb") as file:
+        response = api_client.post("/upload", files={"audio_file": file})
+    recording_id = submit.call_args.args[0]
+    assert f"/recordings/{recording_id}" in response.text
+    assert user_session.get("recordings")[recording_id].audio_hash is not None
+
+
+def test_upload_audio_file_too_large(mocker, api_client, user_session):
+    mocker.patch.object(settings, "MAX_UPLOAD_BYTES", 1_000)
+    audio = scribe.path_from_root("../test/resources/voice_recording.ogg")
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    with open(audio, "rb") as file:
+        response = api_client.post("/upload", files={"audio_file": file})
+        assert response.status_code == 413
+
+
+def test_live_recording_invalid_audio(api_client, user_session):
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    with api_client.websocket_connect("/recordings/live") as websocket:
+        websocket.send_bytes(b"not audio")
+        assert "Invalid file type" in websocket.receive_text()
+
+
+def test_live_recording_not_logged_in(api_client, empty_session):
+    api_client.cookies.set("scribe_session_id", empty_session.id)
+    with api_client.websocket_connect("/recordings/live") as websocket:
+        with pytest.raises(WebSocketDisconnect):
+            websocket.receive_text()
+
+
 def test_transcribe_nonexistent_file(api_client, user_session):
     api_client.cookies.set("scribe_session_id", user_session.id)
     response = api_client.get("/recordings/123")
@@ -80,3 +130,60 @@ def test_transcribe_file(api_client, user_session):
     user_session.set("recordings", {"123": recording})
     response = api_client.get("/recordings/123")
     assert "This is a test recording." in response.text
+
+
+def _transcribed_job():
+    job = TranscriptionJob("123", "test.ogg")
+    job.publish(TranscriptionEvent(type="started"))
+    job.publish(TranscriptionEvent(type="segment", text="This is"))
+    job.publish(TranscriptionEvent(type="complete", text="This is a test."))
+    return job
+
+
+def test_transcription_resumes_after_last_event(mocker, api_client, user_session):
+    job = _transcribed_job()
+    mocker.patch.object(text, "submit_transcription", return_value=job)
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    recording = Recording(id="123", file_path="test.ogg")
+    user_session.set("recordings", {"123": recording})
+
+    response = api_client.get(
+        "/recordings/123", headers={"Last-Event-ID": f"{job.run_id}:2"}
+    )
+    assert "This is a test." in response.text
+    assert f"id: {job.run_id}:3" in response.text
+    assert f"id: {job.run_id}:2" not in response.text
+
+
+def test_transcription_from_another_run_replays_all_events(
+    mocker, api_client, user_session
+):
+    job = _transcribed_job()
+    mocker.patch.object(text, "submit_transcription", return_value=job)
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    recording = Recording(id="123", file_path="test.ogg")
+    user_session.set("recordings", {"123": recording})
+
+    response = api_client.get("/recordings/123", headers={"Last-Event-ID": "old:2"})
+    assert f"id: {job.run_id}:1" in response.text
+    assert f"id: {job.run_id}:3" in response.text
+
+
+def test_completed_transcription_is_pretranslated(mocker, api_client, user_session):
+    mocker.patch.object(text, "submit_transcription", return_value=_transcribed_job())
+    pretranslate = mocker.patch.object(text, "pretranslate")
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    user_session.set("recordings", {"123": Recording(id="123", file_path="test.ogg")})
+
+    api_client.get("/recordings/123")
+    pretranslate.assert_called_once_with("123", "<p>This is a test.</p>")
+
+
+def test_pretranslate_edited_message(mocker, api_client, user_session):
+    pretranslate = mocker.patch.object(text, "pretranslate")
+    api_client.cookies.set("scribe_session_id", user_session.id)
+    response = api_client.post(
+        "/pretranslate", data={"formatted_message": " <p>Edited</p> "}
+    )
+    assert response.status_code == 202
+    pretranslate.assert_called_once_with(user_session.id, "<p>Edited</p>")
@@ -0,0 +1,114 @@
+import asyncio
+
+from scribe.cache.cache import DiskCache
+from scribe.models.models import Channel, User
+from scribe.slack.directory import WorkspaceDirectory
+
+
+def _user(id, name):
+    first_name, last_name = name.split()
+    return User(
+        id=id,
+        real_name=name,
+        real_name_normalized=name,
+        first_name=first_name,
+        last_name=last_name,
+        display_name=name,
+    )
+
+
+_USER = _user("U2", "Zoe Ray")
+
+
+def _client(mocker):
+    client = mocker.Mock()
+    client.users = mocker.AsyncMock(return_value={"U2": _USER})
+    client.conversations = mocker.AsyncMock(
+        return_value=[
+            {"id": "D1", "is_im": True, "user": "U2"},
+            {"id": "C1", "name": "general"},
+        ]
+    )
+    return client
+
+
+def test_logins_share_users(mocker):
+    directory = WorkspaceDirectory(ttl=60)
+    client = _client(mocker)
+
+    async def logins():
+        return await asyncio.gather(*[directory.channels(client) for _ in range(3)])
+
+    for channels in asyncio.run(logins()):
+        assert [c.name for c in channels] == ["general", "Zoe Ray"]
+    client.users.assert_awaited_once()
+    assert client.conversations.await_count == 3
+    resolved = directory.resolve(["C1", "unknown"], {"D1": "U2", "D2": "U3"})
+    assert [c.name for c in resolved] == ["general", "Zoe Ray"]
+
+
+def test_direct_messages_are_named_per_user(mocker):
+    directory = WorkspaceDirectory(ttl=60)
+    ann, zoe = _user("U1", "Ann Lee"), _USER
+    # both users of a direct message see it under the same id
+    first, second = _client(mocker), _client(mocker)
+    first.users.return_value = {"U1": ann, "U2": zoe}
+    first.conversations.return_value = [{"id": "D1", "is_im": True, "user": "U2"}]
+    second.conversations.return_value = [{"id": "D1", "is_im": True, "user": "U1"}]
+
+    async def logins():
+        return await directory.channels(first), await directory.channels(second)
+
+    of_ann, of_zoe = asyncio.run(logins())
+    assert [(c.name, c.user_id) for c in of_ann] == [("Zoe Ray", "U2")]
+    assert [(c.name, c.user_id) for c in of_zoe] == [("Ann Lee", "U1")]
+    assert directory.resolve(["D1"], {}) == []
+    assert [c.name for c in directory.resolve([], {"D1": "U2"})] == ["Zoe Ray"]
+    assert [c.name for c in directory.resolve([], {"D1": "U1"})] == ["Ann Lee"]
+
+
+def test_stale_users_refresh_in_background(mocker):
+    directory = WorkspaceDirectory(ttl=0)
+    client = _client(mocker)
+
+    async def logins():
+        first = await directory.users(client)
+        client.users.return_value = {}
+        second = await directory.users(client)
+        await asyncio.gather(*directory._tasks)
+        return first, second, await directory.users(client)
+
+    first, second, refreshed = asyncio.run(logins())
+    # the stale users are served while they are refreshed
+    assert first == second == {"U2": _USER}
+    assert refreshed == {}
+
+
+def test_persistent_directory(mocker, tmp_path):
+    client = _client(mocker)
+    directory = WorkspaceDirectory(60, DiskCache(str(tmp_path), 1_000_000))
+    asyncio.run(directory.channels(client))
+
+    restarted = WorkspaceDirectory(60, DiskCache(str(tmp_path), 1_000_000))
+    assert restarted.resolve(["C1"], {}) == [Channel(id="C1", name="general")]
+    assert asyncio.run(restarted.users(client)) == {"U2": _USER}
+    client.users.assert_awaited_once()
+
+
+def test_concurrent_logins_persist_channels(mocker, tmp_path):
+    directory = WorkspaceDirectory(60, DiskCache(str(tmp_path), 1_000_000))
+    clients = []
+    for i in range(20):
+        client = _client(mocker)
+        client.conversations.return_value = [
+            {"id": f"C{i}-{j}", "name": f"channel-{i}-{j}"} for j in range(50)
+        ]
+        clients.append(client)
+
+    async def logins():
+        return await asyncio.gather(*[directory.channels(c) for c in clients])
+
+    asyncio.run(logins())
+    restarted = WorkspaceDirectory(60, DiskCache(str(tmp_path), 1_000_000))
+    ids = [f"C{i}-{j}" for i in range(20) for j in range(50)]
+    assert sorted(c.id for c in restarted.resolve(ids, {})) == sorted(ids)
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from scribe.slack.slack import AsyncSlackClient
+
+
+def _response(**data):
+    return {"ok": True, **data}
+
+
+def _client(mocker, delay=0.0):
+    def method(respond):
+        async def call(**kwargs):
+            await asyncio.sleep(delay)
+            return respond(**kwargs)
+
+        return mocker.AsyncMock(side_effect=call)
+
+    pages = {
+        None: _response(
+            channels=[{"id": "C1", "name": "general"}],
+            response_metadata={"next_cursor": "page2"},
+        ),
+        "page2": _response(
+            channels=[{"id": "D1", "is_im": True, "user": "U2"}],
+            response_metadata={"next_cursor": ""},
+        ),
+    }
+    members = [
+        {"id": "U2", "profile": {"first_name": "Zoe", "last_name": "Ray"}},
+        {"id": "B1", "is_bot": True, "profile": {"real_name": "Bot"}},
+    ]
+
+    client = AsyncSlackClient("xoxp-token")
+    api = mocker.patch.object(client, "client")
+    api.openid_connect_userInfo = method(lambda: _response(sub="U1"))
+    api.users_profile_get = method(
+        lambda: _response(profile={"real_name": "Ana Lima", "first_name": "Ana"})
+    )
+    api.team_info = method(lambda: _response(team={"id": "T1", "name": "Team"}))
+    api.users_list = method(lambda cursor: _response(members=members))
+    api.conversations_list = method(lambda cursor, **_: pages[cursor])
+    return client
+
+
+def test_async_client(mocker):
+    async def login():
+        client = _client(mocker)
+        return await asyncio.gather(client.user(), client.team(), client.channels())
+
+    user, team, channels = asyncio.run(login())
+    assert (user.id, user.first_name, user.display_name) == ("U1", "Ana", "Ana")
+    assert team.name == "Team"
+    assert [(c.id, c.name) for c in channels] == [("C1", "general"), ("D1", "Zoe Ray")]
+
+
+def test_async_client_calls_concurrently(mocker):
+    async def login():
+        client = _client(mocker, delay=0.1)
+        started = time.monotonic()
+        await asyncio.gather(client.user(), client.team(), client.channels())
+        return time.monotonic() - started
+
+    # two pages of channels are the longest chain of calls
+    assert asyncio.run(login()) < 0.35
@@ -0,0 +1,46 @@
+import numpy as np
+
+from scribe.text import chunking
+
+RATE = 1000
+
+
+def _speech_with_pauses(seconds, pauses):
+    audio = np.full(seconds * RATE, 0.5, dtype=np.float32)
+    for pause in pauses:
+        audio[int(pause * RATE) : int((pause + 0.5) * RATE)] = 0.0
+    return audio
+
+
+def test_short_audio_is_one_chunk():
+    audio = _speech_with_pauses(30, [])
+    assert chunking.find_chunks(audio, RATE, 60, 1) == [(0.0, 30.0)]
+
+
+def test_chunks_are_cut_at_silence():
+    audio = _speech_with_pauses(100, [28, 61])
+    chunks = chunking.find_chunks(audio, RATE, 30, 1)
+
+    assert len(chunks) == 4
+    assert chunks[0][0] == 0.0
+    assert chunks[-1][1] == 100.0
+    # cuts land inside the pauses, plus the overlap
+    assert 28 + 1 <= chunks[0][1] <= 28.5 + 1
+    assert 61 - 1 <= chunks[2][0] <= 61.5 - 1
+    for (_, end), (start, _) in zip(chunks, chunks[1:]):
+        assert end - start > 1.9
+
+
+def test_merge_removes_overlap():
+    previous = "We will meet on Friday at the main office."
+    current = "the main office. Please bring your badge."
+    assert chunking.merge(previous, current) == "Please bring your badge."
+
+
+def test_merge_ignores_single_word_overlap():
+    assert chunking.merge("Bring the", "the badge.") == "the badge."
+
+
+def test_stitch():
+    texts = ["Hello everyone, today", "everyone, today we launch", "we launch Scribe."]
+    assert chunking.stitch(texts) == "Hello everyone, today we launch Scribe."
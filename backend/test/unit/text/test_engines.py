@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scribe.text import engines
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        engines.load_engine("unknown", "base")
+
+
+def test_quantized_engine_needs_less_memory():
+    assert engines.FasterWhisperEngine.memory("base") < engines.WhisperEngine.memory(
+        "base"
+    )
+
+
+def test_memory_depends_on_compute_type():
+    memory = engines.FasterWhisperEngine.memory
+    assert memory("base", "int8") == memory("base", "int8_float32")
+    assert memory("base", "int8") < memory("base", "float16")
+    assert memory("base", "float16") < memory("base", "float32")
+    assert memory("base", "float32") == engines.WhisperEngine.memory("base")
+
+
+def test_missing_faster_whisper(mocker):
+    mocker.patch.dict("sys.modules", {"faster_whisper": None})
+    with pytest.raises(RuntimeError, match="ctranslate2"):
+        engines.load_engine("faster-whisper", "base")
+
+
+def test_whisper_model_runs_one_transcription_at_a_time(mocker):
+    running = []
+    overlapped = []
+
+    def transcribe(audio, **options):
+        running.append(audio)
+        overlapped.append(len(running) > 1)
+        time.sleep(0.01)
+        running.remove(audio)
+        return {"text": f" {audio} "}
+
+    whisper = mocker.MagicMock()
+    whisper.load_model.return_value.transcribe.side_effect = transcribe
+    mocker.patch.dict("sys.modules", {"whisper": whisper})
+    engine = engines.load_engine("whisper", "base")
+
+    with ThreadPoolExecutor(4) as pool:
+        texts = list(pool.map(engine.transcribe, ["a", "b", "c", "d"]))
+    assert texts == ["a", "b", "c", "d"]
+    assert not any(overlapped)
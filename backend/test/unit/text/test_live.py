@@ -0,0 +1,114 @@
+import asyncio
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from scribe.audio import audio
+from scribe.exceptions import InvalidAudioException, UploadTooLargeException
+from scribe.text import live, text
+
+
+@pytest.fixture
+def windows(mocker, tmp_path):
+    mocker.patch.object(text, "_transcription_cache", None)
+    mocker.patch.object(text, "_scheduler", None)
+    mocker.patch("scribe.text.text.settings.UPLOAD_PATH", str(tmp_path))
+    received = {"seconds": 0}
+
+    class Decoder:
+        decoded = 0
+
+        def write(self, data):
+            pass
+
+        def read(self):
+            samples = received["seconds"] * audio.SAMPLE_RATE - self.decoded
+            self.decoded += samples
+            return np.zeros(samples, dtype=np.int16)
+
+        def close(self):
+            return self.read()
+
+        def kill(self):
+            pass
+
+    mocker.patch.object(audio, "StreamDecoder", Decoder)
+    calls = []
+
+    def transcribe_window(file_path, start, end, prompt=None, model=None):
+        calls.append((start, end))
+        return f"[{start:.1f}-{end:.1f}]"
+
+    mocker.patch.object(text, "transcribe_window", side_effect=transcribe_window)
+    return received, calls
+
+
+def test_windows_are_transcribed_while_recording(windows, tmp_path):
+    received, calls = windows
+    recording = live.LiveTranscription("abc", str(tmp_path), "base", 10, 1_000)
+
+    async def record():
+        received["seconds"] = 25
+        await recording.append(b"OggS" + b"\x00" * 10)
+        await recording._task
+        during = list(calls)
+        received["seconds"] = 32
+        await recording.append(b"\x00" * 10)
+        return during, await recording.finish()
+
+    during, transcription = asyncio.run(record())
+    assert during and during[-1][1] < 25
+    assert calls[0][0] == 0
+    assert calls[-1][1] == pytest.approx(32, abs=0.01)
+    assert all(end == start for (_, end), (start, _) in zip(calls, calls[1:]))
+    assert transcription == " ".join(f"[{s:.1f}-{e:.1f}]" for s, e in calls)
+    assert recording.file_path == str(tmp_path / "abc.ogg")
+    assert recording.duration == 32
+    assert audio.duration(recording.pcm_path) == 32
+
+
+def test_invalid_audio(tmp_path):
+    recording = live.LiveTranscription("abc", str(tmp_path), "base", 10, 1_000)
+    with pytest.raises(InvalidAudioException):
+        asyncio.run(recording.append(b"not audio"))
+
+
+def test_recording_too_large(windows, tmp_path):
+    recording = live.LiveTranscription("abc", str(tmp_path), "base", 10, 100)
+
+    async def record():
+        await recording.append(b"OggS" + b"\x00" * 60)
+        await recording.append(b"\x00" * 60)
+
+    with pytest.raises(UploadTooLargeException):
+        asyncio.run(record())
+    asyncio.run(recording.abort())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_abort_waits_for_running_window(windows, tmp_path, mocker):
+    received, _ = windows
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def transcribe_window(file_path, start, end, prompt=None, model=None):
+        started.set()
+        release.wait(5)
+        seen.append(os.path.exists(file_path))
+        return "text"
+
+    mocker.patch.object(text, "transcribe_window", side_effect=transcribe_window)
+    recording = live.LiveTranscription("abc", str(tmp_path), "base", 10, 1_000)
+
+    async def record():
+        received["seconds"] = 25
+        await recording.append(b"OggS" + b"\x00" * 10)
+        await asyncio.to_thread(started.wait, 5)
+        asyncio.get_running_loop().call_later(0.1, release.set)
+        await recording.abort()
+
+    asyncio.run(record())
+    assert seen == [True]
+    assert list(tmp_path.iterdir()) == []
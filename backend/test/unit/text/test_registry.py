@@ -0,0 +1,33 @@
+from scribe.text.registry import ModelRegistry, model_memory
+
+
+def test_model_memory():
+    assert model_memory("tiny") < model_memory("base.en") < model_memory("small")
+    assert model_memory("large-v3") == model_memory("large")
+
+
+def test_models_are_loaded_once():
+    loads = []
+    registry = ModelRegistry(lambda name: loads.append(name) or name, budget_mb=1_000)
+    assert registry.get("base") == "base"
+    assert registry.get("base") == "base"
+    assert loads == ["base"]
+
+
+def test_least_recently_used_model_is_evicted():
+    registry = ModelRegistry(lambda name: name, budget_mb=500)
+    registry.get("tiny")
+    registry.get("base")
+    registry.get("tiny")
+    assert registry.loaded == ["base", "tiny"]
+    registry.get("base")
+    registry.get("tiny")
+    registry.get("small")
+    assert registry.loaded == ["small"]
+
+
+def test_budget_allows_several_small_models():
+    registry = ModelRegistry(lambda name: name, budget_mb=500)
+    registry.get("tiny")
+    registry.get("base")
+    assert registry.loaded == ["tiny", "base"]
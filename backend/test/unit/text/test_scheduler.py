@@ -0,0 +1,209 @@
+import asyncio
+from contextlib import aclosing
+
+from scribe.models.models import TranscriptionEventType
+from scribe.text.scheduler import TranscriptionScheduler
+
+
+def _scheduler(max_jobs=1, policy="fifo", fail=(), abandon_after=30.0):
+    release = asyncio.Event()
+    order = []
+
+    async def transcribe(job):
+        order.append(job.id)
+        await release.wait()
+        if job.id in fail:
+            raise RuntimeError("bad audio")
+        return f"text for {job.id}"
+
+    scheduler = TranscriptionScheduler(
+        transcribe, max_jobs=max_jobs, policy=policy, abandon_after=abandon_after
+    )
+    return scheduler, release, order
+
+
+async def _collect(job):
+    return [event async for event in job.watch()]
+
+
+def test_jobs_run_to_completion():
+    async def run():
+        scheduler, release, _ = _scheduler()
+        job = scheduler.submit("a", "a.ogg", 10)
+        release.set()
+        return await _collect(job)
+
+    events = asyncio.run(run())
+    assert [e.type for e in events] == [
+        TranscriptionEventType.started,
+        TranscriptionEventType.complete,
+    ]
+    assert events[-1].text == "text for a"
+
+
+def test_queue_positions_and_concurrency_limit():
+    async def run():
+        scheduler, release, order = _scheduler(max_jobs=1)
+        first = scheduler.submit("a", "a.ogg", 10)
+        second = scheduler.submit("b", "b.ogg", 10)
+        third = scheduler.submit("c", "c.ogg", 10)
+        await asyncio.sleep(0)
+        assert order == ["a"]
+        assert third.events[-1].type == TranscriptionEventType.queued
+        assert third.events[-1].position == 2
+        assert third.events[-1].estimated_start > second.events[-1].estimated_start
+        release.set()
+        await asyncio.gather(_collect(first), _collect(second), _collect(third))
+        return order, third
+
+    order, third = asyncio.run(run())
+    assert order == ["a", "b", "c"]
+    positions = [e.position for e in third.events if e.type == "queued"]
+    assert positions == [2, 1]
+
+
+def test_shortest_first_policy():
+    async def run():
+        scheduler, release, order = _scheduler(max_jobs=1, policy="shortest")
+        jobs = [
+            scheduler.submit("running", "r.ogg", 5),
+            scheduler.submit("long", "l.ogg", 300),
+            scheduler.submit("short", "s.ogg", 3),
+        ]
+        release.set()
+        await asyncio.gather(*[_collect(job) for job in jobs])
+        return order
+
+    assert asyncio.run(run()) == ["running", "short", "long"]
+
+
+def test_failed_job():
+    async def run():
+        scheduler, release, _ = _scheduler(fail=("a",))
+        job = scheduler.submit("a", "a.ogg")
+        release.set()
+        return await _collect(job)
+
+    events = asyncio.run(run())
+    assert events[-1].type == TranscriptionEventType.failed
+    assert events[-1].error == "bad audio"
+
+
+def test_duplicate_submission_reuses_job():
+    async def run():
+        scheduler, release, order = _scheduler()
+        job = scheduler.submit("a", "a.ogg")
+        assert scheduler.submit("a", "a.ogg") is job
+        release.set()
+        await _collect(job)
+        return order
+
+    assert asyncio.run(run()) == ["a"]
+
+
+def test_completed_jobs_are_retained():
+    async def run():
+        scheduler, release, order = _scheduler(fail=("b",))
+        scheduler._retained_jobs = 1
+        release.set()
+        first = scheduler.submit("a", "a.ogg")
+        await _collect(first)
+        assert scheduler.submit("a", "a.ogg") is first
+        await _collect(scheduler.submit("b", "b.ogg"))
+        assert scheduler.get("b") is None
+        await _collect(scheduler.submit("c", "c.ogg"))
+        assert scheduler.get("a") is None
+        return order
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+
+
+def test_unwatched_jobs_are_cancelled():
+    async def run():
+        scheduler, _, order = _scheduler(max_jobs=1, abandon_after=0.01)
+        running = scheduler.submit("a", "a.ogg")
+        queued = scheduler.submit("b", "b.ogg")
+        await asyncio.sleep(0.05)
+        assert scheduler.get("a") is None and scheduler.get("b") is None
+        return running, queued, order
+
+    running, queued, order = asyncio.run(run())
+    assert order == ["a"]
+    assert running.events[-1].type == TranscriptionEventType.cancelled
+    assert queued.events[-1].type == TranscriptionEventType.cancelled
+
+
+def test_watched_jobs_are_not_cancelled():
+    async def run():
+        scheduler, release, _ = _scheduler(abandon_after=0.01)
+        job = scheduler.submit("a", "a.ogg")
+        watcher = asyncio.create_task(_collect(job))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await watcher
+
+    events = asyncio.run(run())
+    assert events[-1].type == TranscriptionEventType.complete
+
+
+def test_jobs_are_cancelled_after_the_last_subscriber_leaves():
+    async def run():
+        scheduler, _, _ = _scheduler(abandon_after=0.05)
+        job = scheduler.submit("a", "a.ogg")
+        async with aclosing(job.watch()) as events:
+            await anext(events)
+            await asyncio.sleep(0.1)
+        assert job.subscribers == 0
+        assert not job.done
+        await asyncio.sleep(0.1)
+        return job
+
+    job = asyncio.run(run())
+    assert job.events[-1].type == TranscriptionEventType.cancelled
+
+
+def test_watching_after_the_last_event_of_a_finished_job():
+    async def run():
+        scheduler, release, _ = _scheduler()
+        job = scheduler.submit("a", "a.ogg")
+        release.set()
+        events = await _collect(job)
+        return await _collect_after(job, len(events))
+
+    assert asyncio.run(run()) == []
+
+
+async def _collect_after(job, after):
+    return [event async for event in job.watch(after)]
+
+
+def test_slots_share_capacity_with_jobs():
+    async def run():
+        scheduler, release, order = _scheduler(max_jobs=1)
+        async with scheduler.slot(10):
+            first = scheduler.submit("a", "a.ogg", 10)
+            await asyncio.sleep(0)
+            assert order == []
+            assert first.events[-1].type == TranscriptionEventType.queued
+            assert first.events[-1].estimated_start > 0
+        await asyncio.sleep(0)
+        assert order == ["a"]
+
+        entered, leave = asyncio.Event(), asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot(10):
+                entered.set()
+                await leave.wait()
+
+        holding = asyncio.create_task(hold())
+        second = scheduler.submit("b", "b.ogg", 10)
+        release.set()
+        await entered.wait()
+        # the waiting slot started ahead of the queued job
+        assert order == ["a"]
+        leave.set()
+        await asyncio.gather(holding, _collect(first), _collect(second))
+        return order
+
+    assert asyncio.run(run()) == ["a", "b"]
@@ -0,0 +1,27 @@
+from scribe.text import segments
+
+
+def test_split_paragraphs():
+    html = "<p>One <em>two</em>.</p>\n<p>Three.</p>\n"
+    assert segments.split(html) == [
+        "<p>One <em>two</em>.</p>",
+        "\n",
+        "<p>Three.</p>",
+        "\n",
+    ]
+
+
+def test_split_nested_blocks():
+    html = "<ul><li><p>One</p></li><li>Two</li></ul><p>Three</p>trailing"
+    parts = segments.split(html)
+    assert parts == [
+        "<ul><li><p>One</p></li><li>Two</li></ul>",
+        "<p>Three</p>",
+        "trailing",
+    ]
+    assert "".join(parts) == html
+
+
+def test_is_blank():
+    assert segments.is_blank('<p><img src="x" /></p>\n')
+    assert not segments.is_blank("<p>text</p>")
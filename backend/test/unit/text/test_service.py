@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scribe.config.settings import settings
+from scribe.text import text
+from scribe.text.service import TranscriptionServer
+
+
+@pytest.fixture()
+def service(mocker, tmp_path):
+    path = str(tmp_path / "transcriber.sock")
+    mocker.patch.object(settings, "TRANSCRIPTION_SOCKET", path)
+    server = TranscriptionServer(path, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_transcribe_through_service(service, mocker):
+    local = mocker.patch.object(
+        text, "transcribe_local", return_value="This is a test recording."
+    )
+    assert text.transcribe("recording.ogg") == "This is a test recording."
+    local.assert_called_once_with(file_path="recording.ogg", model=None)
+
+
+def test_service_errors_are_raised_in_client(service):
+    with pytest.raises(FileNotFoundError):
+        text.transcribe("/not/a/real/path.ogg")
+
+
+def test_service_unavailable(mocker, tmp_path):
+    mocker.patch.object(settings, "TRANSCRIPTION_SOCKET", str(tmp_path / "none.sock"))
+    with pytest.raises(RuntimeError):
+        text.transcribe("recording.ogg")
+
+
+def test_service_timeout(service, mocker):
+    mocker.patch.object(settings, "TRANSCRIPTION_SOCKET_TIMEOUT_SECONDS", 0.1)
+    released = threading.Event()
+    mocker.patch.object(text, "transcribe_local", lambda **_: released.wait(5))
+    with pytest.raises(RuntimeError, match="in time"):
+        text.transcribe("recording.ogg")
+    released.set()
+
+
+def test_requests_take_turns_on_a_model(mocker, tmp_path):
+    path = str(tmp_path / "transcriber.sock")
+    mocker.patch.object(settings, "TRANSCRIPTION_SOCKET", path)
+    mocker.patch.object(settings, "TRANSCRIPTION_ENGINE", "whisper")
+    mocker.patch.object(text, "_registry", None)
+    running = []
+    overlapped = []
+
+    def transcribe(audio, **options):
+        running.append(audio)
+        overlapped.append(len(running) > 1)
+        time.sleep(0.01)
+        running.remove(audio)
+        return {"text": "This is a test recording."}
+
+    whisper = mocker.MagicMock()
+    whisper.load_model.return_value.transcribe.side_effect = transcribe
+    mocker.patch.dict("sys.modules", {"whisper": whisper})
+    recording = tmp_path / "recording.ogg"
+    recording.touch()
+
+    server = TranscriptionServer(path, workers=4)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            texts = list(pool.map(text.transcribe, [str(recording)] * 4))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert texts == ["This is a test recording."] * 4
+    assert len(overlapped) == 4 and not any(overlapped)
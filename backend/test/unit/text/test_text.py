@@ -1,7 +1,15 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
 import pytest
 
 import scribe
+from scribe.audio import audio
+from scribe.config.settings import settings
 from scribe.text import text
+from scribe.text.translation import DeepLBackend
 
 
 def test_transcribe_non_existent_file():
@@ -21,9 +29,225 @@ def test_transcribe_recording():
     assert transcription == "This is a test recording."
 
 
+def test_transcribe_recording_async():
+    file = scribe.path_from_root("../test/resources/voice_recording.ogg")
+    transcription = asyncio.run(text.transcribe_async(str(file.absolute())))
+    assert transcription == "This is a test recording."
+
+
+def test_transcribe_stream(mocker):
+    mocker.patch.object(settings, "TRANSCRIPTION_STREAM_WINDOW_SECONDS", 1)
+    file = str(scribe.path_from_root("../test/resources/voice_recording.ogg"))
+
+    async def collect():
+        duration = audio.duration(file)
+        return [segment async for segment in text.transcribe_stream(file, duration)]
+
+    segments = asyncio.run(collect())
+    assert len(segments) > 1
+    assert "test recording" in " ".join(segments)
+
+
+def test_transcribe_stream_merges_overlaps(mocker, tmp_path):
+    mocker.patch.object(settings, "TRANSCRIPTION_STREAM_WINDOW_SECONDS", 10)
+    mocker.patch.object(settings, "TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", 1.0)
+    file = tmp_path / "recording.pcm"
+    file.touch()
+    waveform = np.ones(25 * audio.SAMPLE_RATE, dtype=np.float32)
+    # a silence near the end of the first window
+    waveform[9 * audio.SAMPLE_RATE : 10 * audio.SAMPLE_RATE] = 0
+    mocker.patch.object(audio, "load", return_value=waveform)
+    windows = []
+
+    def transcribe_window(file_path, start, end, prompt=None, model=None):
+        windows.append((start, end))
+        return ["one two three four", "three four five six", "five six seven"][
+            len(windows) - 1
+        ]
+
+    mocker.patch.object(text, "transcribe_window", transcribe_window)
+
+    async def collect():
+        return [s async for s in text.transcribe_stream(str(file), 25.0)]
+
+    segments = asyncio.run(collect())
+    assert " ".join(segments) == "one two three four five six seven"
+    # the first cut moved into the silence and the windows overlap
+    assert 8.0 < windows[0][1] < 10.5
+    assert windows[1][0] < windows[0][1]
+
+
+def test_workers_share_model_registry(mocker):
+    mocker.patch.object(text, "_registry", None)
+    registry = text.ModelRegistry
+
+    def slow_registry(*args):
+        # widen the window between checking for and creating the registry
+        time.sleep(0.05)
+        return registry(*args)
+
+    mocker.patch.object(text, "ModelRegistry", side_effect=slow_registry)
+    load = mocker.patch.object(text, "_load_engine")
+    threads = [threading.Thread(target=text.get_engine) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    load.assert_called_once()
+
+
+def test_transcription_cache(mocker, tmp_path):
+    mocker.patch.object(settings, "UPLOAD_PATH", str(tmp_path))
+    mocker.patch.object(text, "_transcription_cache", None)
+    file = str(scribe.path_from_root("../test/resources/voice_recording.ogg"))
+
+    async def transcribe_twice():
+        first = await text.submit_transcription("first", file)
+        events = [event async for event in first.watch()]
+        second = await text.submit_transcription("second", file)
+        return events[-1], second
+
+    event, cached = asyncio.run(transcribe_twice())
+    assert event.text == "This is a test recording."
+    assert cached.done
+    assert cached.events[-1].text == "This is a test recording."
+
+
 def test_pseudo_translation():
     # pyproject.toml set the pseudo translate setting to on.
     # testing DeepL would require an API key.
     raw = "<p>This <em>is</em> a <strong>test</strong>.</p>"
-    translated = text.translate(raw, "pt")
+    translated = asyncio.run(text.translate(raw, "pt"))
     assert translated == "<p>THIS <em>IS</em> A <strong>TEST</strong>.</p>"
+
+
+def test_translate_all():
+    translations = asyncio.run(text.translate_all("<p>Hello</p>", ["es", "fr", "ru"]))
+    assert translations == {
+        "es": "<p>HELLO</p>",
+        "fr": "<p>HELLO</p>",
+        "ru": "<p>HELLO</p>",
+    }
+
+
+def test_translate_all_timeout(mocker):
+    mocker.patch.object(settings, "TRANSLATION_TIMEOUT_SECONDS", 0.05)
+
+    async def translate(*_):
+        await asyncio.sleep(0.5)
+
+    mocker.patch.object(text, "translate", side_effect=translate)
+
+    with pytest.raises(text.TranslationException):
+        asyncio.run(text.translate_all("<p>Hello</p>", ["es"]))
+
+
+def test_translation_cache(mocker, tmp_path):
+    mocker.patch.object(settings, "UPLOAD_PATH", str(tmp_path))
+    mocker.patch.object(settings, "PSEUDO_TRANSLATE", False)
+    mocker.patch.object(text, "_translation_cache", None)
+    deepl = mocker.patch.object(DeepLBackend, "translate", return_value=["<p>Hola</p>"])
+
+    assert asyncio.run(text.translate("<p>Hello</p>", "es")) == "<p>Hola</p>"
+    assert asyncio.run(text.translate("<p>Hello</p>", "es")) == "<p>Hola</p>"
+    deepl.assert_awaited_once()
+    assert text.translation_cache().hits == 1
+
+    # the disk tier survives a restart
+    mocker.patch.object(text, "_translation_cache", None)
+    assert asyncio.run(text.translate("<p>Hello</p>", "es")) == "<p>Hola</p>"
+    deepl.assert_awaited_once()
+    asyncio.run(text.translate("<p>Hello</p>", "fr"))
+    assert deepl.await_count == 2
+
+
+def test_translate_changed_paragraphs(mocker, tmp_path):
+    mocker.patch.object(settings, "UPLOAD_PATH", str(tmp_path))
+    mocker.patch.object(settings, "PSEUDO_TRANSLATE", False)
+    mocker.patch.object(text, "_translation_cache", None)
+    deepl = mocker.patch.object(
+        DeepLBackend,
+        "translate",
+        side_effect=lambda texts, *_: [t.upper() for t in texts],
+    )
+
+    first = asyncio.run(
+        text.translate("<p>One</p>\n<p>Two</p>\n<p><img src=x></p>", "es")
+    )
+    assert first == "<P>ONE</P>\n<P>TWO</P>\n<p><img src=x></p>"
+    deepl.assert_awaited_once_with(["<p>One</p>", "<p>Two</p>"], "en", "es")
+
+    edited = asyncio.run(text.translate("<p>One</p>\n<p>Three</p>\n<p>Two</p>", "es"))
+    assert edited == "<P>ONE</P>\n<P>THREE</P>\n<P>TWO</P>"
+    deepl.assert_awaited_with(["<p>Three</p>"], "en", "es")
+
+
+def test_pretranslate_keeps_latest_text(mocker):
+    translated = []
+
+    async def translate_all(message, languages):
+        await asyncio.sleep(0.01)
+        translated.append(message)
+        return {}
+
+    mocker.patch.object(text, "translate_all", side_effect=translate_all)
+
+    async def edit():
+        for message in ("<p>a</p>", "<p>ab</p>", "<p>abc</p>"):
+            text.pretranslate("editor", message)
+        await asyncio.gather(*text._pretranslation_tasks)
+
+    asyncio.run(edit())
+    assert translated == ["<p>a</p>", "<p>abc</p>"]
+    assert "editor" not in text._pretranslations
+
+
+def test_concurrent_translations_share_request(mocker, tmp_path):
+    mocker.patch.object(settings, "UPLOAD_PATH", str(tmp_path))
+    mocker.patch.object(settings, "PSEUDO_TRANSLATE", False)
+    mocker.patch.object(text, "_translation_cache", None)
+
+    async def deepl_translate(texts, *_):
+        await asyncio.sleep(0.01)
+        return [t.upper() for t in texts]
+
+    deepl = mocker.patch.object(DeepLBackend, "translate", side_effect=deepl_translate)
+
+    async def double_submit():
+        message = "<p>Hello</p>"
+        return await asyncio.gather(
+            text.translate(message, "es"), text.translate(message, "es")
+        )
+
+    assert asyncio.run(double_submit()) == ["<P>HELLO</P>", "<P>HELLO</P>"]
+    deepl.assert_awaited_once()
+
+
+def test_translation_backend_per_language(mocker, tmp_path):
+    mocker.patch.object(settings, "UPLOAD_PATH", str(tmp_path))
+    mocker.patch.object(settings, "PSEUDO_TRANSLATE", False)
+    mocker.patch.object(settings, "TRANSLATION_BACKENDS", {"ru": "pseudo"})
+    mocker.patch.object(text, "_translation_cache", None)
+    deepl = mocker.patch.object(DeepLBackend, "translate", return_value=["<p>Hola</p>"])
+
+    translations = asyncio.run(text.translate_all("<p>Hello</p>", ["es", "ru"]))
+    assert translations == {"es": "<p>Hola</p>", "ru": "<p>HELLO</p>"}
+    deepl.assert_awaited_once()
+
+
+def test_unknown_translation_backend(mocker):
+    mocker.patch.object(settings, "PSEUDO_TRANSLATE", False)
+    mocker.patch.object(settings, "TRANSLATION_BACKEND", "unknown")
+    with pytest.raises(text.TranslationException):
+        asyncio.run(text.translate("<p>Hello</p>", "es"))
+
+
+def test_close_translation_backends(mocker):
+    mocker.patch.object(settings, "TRANSLATION_BACKENDS", {"ru": "pseudo"})
+    backend = text.translation_backend("ru")
+    assert text.translation_backend("ru") is backend
+    aclose = mocker.patch.object(backend, "aclose")
+
+    asyncio.run(text.close_translator())
+    aclose.assert_awaited_once()
+    assert text.translation_backend("ru") is not backend
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from scribe.text.translation import MarianBackend, PseudoBackend
+
+
+def test_pseudo_backend():
+    translated = asyncio.run(
+        PseudoBackend().translate(["<p>One <em>two</em></p>", "three"], "en", "es")
+    )
+    assert translated == ["<p>ONE <em>TWO</em></p>", "THREE"]
+
+
+def test_marian_backend_needs_extra(mocker):
+    mocker.patch("importlib.util.find_spec", return_value=None)
+    with pytest.raises(RuntimeError):
+        MarianBackend()
+
+
+def _marian(mocker, translate):
+    mocker.patch("importlib.util.find_spec", return_value=object())
+    backend = MarianBackend(models={"ru": "opus-mt-en-ru-custom"})
+    plain = mocker.patch.object(
+        backend,
+        "_translate_plain",
+        side_effect=lambda texts, _: [translate(t) for t in texts],
+    )
+    return backend, plain
+
+
+def test_marian_backend_keeps_tags(mocker):
+    backend, plain = _marian(mocker, lambda t: t.upper().replace("<X", "<x"))
+
+    translated = asyncio.run(
+        backend.translate(
+            ["<p>This <em>is</em> a test &amp; more</p>", "<p> </p>"], "en", "es"
+        )
+    )
+    assert translated == ["<p>THIS <em>IS</em> A TEST &amp; MORE</p>", "<p> </p>"]
+    # inline tags are replaced by markers, so the sentence is translated whole
+    plain.assert_called_once_with(
+        ["This <x0>is<x1> a test & more"], "Helsinki-NLP/opus-mt-en-es"
+    )
+    assert backend.model_name("en", "ru") == "opus-mt-en-ru-custom"
+    assert backend.cache_tag("es") != backend.cache_tag("ru")
+
+
+def test_marian_backend_translates_blocks_separately(mocker):
+    backend, plain = _marian(mocker, lambda t: t)
+
+    asyncio.run(
+        backend.translate(
+            ["<ul><li>One <b>two</b></li><li>Three</li></ul>"], "en", "es"
+        )
+    )
+    plain.assert_called_once_with(["One <x0>two<x1>", "Three"], mocker.ANY)
+
+
+def test_marian_backend_moves_markers_with_words(mocker):
+    # the model moved the emphasised word to the end of the sentence
+    backend, _ = _marian(mocker, lambda t: "Una prueba <x0>es<x1>")
+
+    translated = asyncio.run(backend.translate(["<p>A <em>test</em></p>"], "en", "es"))
+    assert translated == ["<p>Una prueba <em>es</em></p>"]
+
+
+def test_marian_backend_dropped_markers(mocker):
+    backend, _ = _marian(mocker, lambda t: "Esto es una prueba")
+
+    translated = asyncio.run(
+        backend.translate(
+            ["<p><strong>This <em>is</em> a test</strong></p>"], "en", "es"
+        )
+    )
+    assert translated == ["<p><strong>Esto es una prueba<em></em></strong></p>"]
+
+
+def test_marian_backend_splits_long_texts(mocker):
+    mocker.patch("importlib.util.find_spec", return_value=object())
+    tokenizer = mocker.Mock(model_max_length=6, tokenize=str.split)
+    pieces = MarianBackend._pieces(
+        "One two. Three four five. Six seven eight nine ten eleven.", tokenizer
+    )
+    assert pieces == [
+        "One two. Three four five.",
+        "Six seven eight nine ten",
+        "eleven.",
+    ]
+    assert MarianBackend._pieces("One two.", tokenizer) == ["One two."]
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scribe.config.settings import settings
+from scribe.text import text
+from scribe.text.translator import DeepLClient, DeepLError, TokenBucket, _backoff
+
+
+class StubDeepL(BaseHTTPRequestHandler):
+    """
+    Answers /v2/translate like DeepL, uppercasing the texts.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(200, {"character_count": 1200, "character_limit": 500000})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, self.headers["Authorization"], body))
+        if self.server.throttled > 0:
+            self.server.throttled -= 1
+            self._respond(429, {"message": "Too many requests"}, {"Retry-After": "0"})
+            return
+
+        if body["target_lang"] == "XX":
+            status, response = 400, {
+                "message": "Value for 'target_lang' not supported."
+            }
+        else:
+            translations = [{"text": t.upper()} for t in body["text"]]
+            status, response = 200, {"translations": translations}
+        self._respond(status, response)
+
+    def _respond(self, status, response, headers=None):
+        data = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def deepl_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubDeepL)
+    server.requests = []
+    server.throttled = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_translate(deepl_server):
+    async def translate():
+        client = DeepLClient("key:fx", server_url=_url(deepl_server))
+        try:
+            return await client.translate(
+                ["<p>One</p>", "<p>Two</p>"], "ES", "EN", tag_handling="html"
+            )
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(translate()) == ["<P>ONE</P>", "<P>TWO</P>"]
+    path, authorization, body = deepl_server.requests[0]
+    assert path == "/v2/translate"
+    assert authorization == "DeepL-Auth-Key key:fx"
+    assert body == {
+        "text": ["<p>One</p>", "<p>Two</p>"],
+        "target_lang": "ES",
+        "source_lang": "EN",
+        "tag_handling": "html",
+    }
+
+
+def test_translate_error(deepl_server):
+    async def translate():
+        client = DeepLClient("key", server_url=_url(deepl_server))
+        try:
+            return await client.translate(["One"], "XX")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(DeepLError) as err:
+        asyncio.run(translate())
+    assert err.value.status_code == 400
+
+
+def test_translate_message(mocker, tmp_path, deepl_server):
+    mocker.patch.object(settings, "UPLOAD_PATH", str(tmp_path))
+    mocker.patch.object(settings, "PSEUDO_TRANSLATE", False)
+    mocker.patch.object(settings, "DEEPL_SERVER_URL", _url(deepl_server))
+    mocker.patch.object(text, "_translation_cache", None)
+
+    async def publish():
+        try:
+            return await text.translate_all("<p>Hello</p>\n<p>World</p>", ["es", "pt"])
+        finally:
+            await text.close_translator()
+
+    translations = asyncio.run(publish())
+    assert translations == {
+        "es": "<P>HELLO</P>\n<P>WORLD</P>",
+        "pt": "<P>HELLO</P>\n<P>WORLD</P>",
+    }
+    # one request per language carrying every paragraph
+    targets = sorted(body["target_lang"] for _, _, body in deepl_server.requests)
+    assert targets == ["ES", "PT-BR"]
+
+
+def test_retry_throttled_request(mocker, deepl_server):
+    mocker.patch("scribe.text.translator.MAX_BACKOFF", 0.01)
+    deepl_server.throttled = 2
+
+    async def translate():
+        client = DeepLClient("key", server_url=_url(deepl_server))
+        try:
+            return await client.translate(["One"], "ES"), client.characters_sent
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(translate()) == (["ONE"], 3)
+    assert len(deepl_server.requests) == 3
+
+
+def test_retries_exhausted(mocker, deepl_server):
+    mocker.patch("scribe.text.translator.MAX_BACKOFF", 0.01)
+    deepl_server.throttled = 5
+
+    async def translate():
+        client = DeepLClient("key", server_url=_url(deepl_server), max_retries=1)
+        try:
+            return await client.translate(["One"], "ES")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(DeepLError) as err:
+        asyncio.run(translate())
+    assert err.value.status_code == 429
+    assert len(deepl_server.requests) == 2
+
+
+def test_backoff_honors_retry_after():
+    assert _backoff(0, "3") == 3.0
+    assert _backoff(10) <= 30.0
+    assert _backoff(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= 0.5
+
+
+def test_usage(deepl_server):
+    async def usage():
+        client = DeepLClient("key", server_url=_url(deepl_server))
+        try:
+            return await client.usage()
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(usage()) == (1200, 500000)
+
+
+def test_token_bucket_limits_rate():
+    async def acquire_burst():
+        bucket = TokenBucket(rate=100, capacity=2)
+        start = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # two tokens are available at once, the other four refill at 100 per second
+    assert asyncio.run(acquire_burst()) >= 0.035
@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+
+import scribe
+from scribe.exceptions import InvalidAudioException, UploadTooLargeException
+from scribe.uploads import uploads
+
+
+def _upload(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="recording.ogg")
+
+
+@pytest.mark.parametrize(
+    "header, mime_type",
+    [
+        (b"OggS\x00\x02", "audio/ogg"),
+        (b"fLaC\x00\x00", "audio/flac"),
+        (b"ID3\x04\x00", "audio/mpeg"),
+        (b"\xff\xfb\x90\x00", "audio/mpeg"),
+        (b"RIFF\x24\x08\x00\x00WAVEfmt ", "audio/wav"),
+        (b"\x1a\x45\xdf\xa3\x9f", "audio/webm"),
+        (b"not audio", None),
+        (b"", None),
+    ],
+)
+def test_sniff(header, mime_type):
+    detected = uploads.sniff(header)
+    assert (detected[0] if detected else None) == mime_type
+
+
+def test_save(mocker, tmp_path):
+    mocker.patch.object(uploads, "CHUNK_BYTES", 4)
+    audio = scribe.path_from_root("../test/resources/voice_recording.ogg")
+    content = audio.read_bytes()
+
+    stored = asyncio.run(uploads.save(_upload(content), str(tmp_path), "abc", 10**8))
+    assert stored.file_path == str(tmp_path / "abc.ogg")
+    assert stored.mime_type == "audio/ogg"
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert (tmp_path / "abc.ogg").read_bytes() == content
+
+
+def test_save_invalid_audio(tmp_path):
+    with pytest.raises(InvalidAudioException):
+        asyncio.run(uploads.save(_upload(b"not audio"), str(tmp_path), "abc", 100))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_too_large(mocker, tmp_path):
+    mocker.patch.object(uploads, "CHUNK_BYTES", 4)
+    upload = _upload(b"OggS" + b"\x00" * 100)
+    with pytest.raises(UploadTooLargeException):
+        asyncio.run(uploads.save(upload, str(tmp_path), "abc", 50))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_max_body_size():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return len(await request.body())
+
+    app.add_middleware(uploads.MaxBodySizeMiddleware, max_bytes=10)
+    client = TestClient(app)
+    assert client.post("/echo", content=b"x" * 10).json() == 10
+    assert client.post("/echo", content=b"x" * 11).status_code == 413
+
+    def chunked():
+        yield b"x" * 6
+        yield b"x" * 6
+
+    assert client.post("/echo", content=chunked()).status_code == 413
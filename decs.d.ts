@@ -1,6 +1,7 @@
 declare module '@hotwired/turbo' {
   export const connectStreamSource: (es: EventSource) => void
   export const disconnectStreamSource: (es: EventSource) => void
+  export const renderStreamMessage: (html: string) => void
 
   export const visit: (location, options?) => void
 }
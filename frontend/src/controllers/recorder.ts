@@ -6,10 +6,14 @@ export default class extends Controller {
   recorder: MediaRecorder | null = null
   audioChunks: Blob[] = []
   audioRecording: Blob | null = null
+  socket: WebSocket | null = null
 
   declare permissionGrantedValue: boolean
+  declare timesliceValue: number
   static values = {
     permissionGranted: { type: Boolean, default: false },
+    // how often, in milliseconds, recorded audio is sent to the server
+    timeslice: { type: Number, default: 1000 },
   }
 
   declare readonly btnTarget: HTMLButtonElement
@@ -18,7 +22,16 @@ export default class extends Controller {
   declare readonly stopIconTarget: SVGElement
   declare readonly loadingIconTarget: SVGElement
   declare readonly audioInputTarget: HTMLInputElement
-  static targets = ['btn', 'disabledIcon', 'playIcon', 'stopIcon', 'loadingIcon', 'audioInput']
+  declare readonly profileTarget: HTMLSelectElement
+  static targets = [
+    'btn',
+    'disabledIcon',
+    'playIcon',
+    'stopIcon',
+    'loadingIcon',
+    'audioInput',
+    'profile',
+  ]
 
   async initialize(): Promise<void> {
     if (
@@ -33,6 +46,9 @@ export default class extends Controller {
 
         this.recorder.ondataavailable = (event) => {
           this.audioChunks.push(event.data)
+          if (this.socket?.readyState === WebSocket.OPEN) {
+            this.socket.send(event.data)
+          }
         }
 
         this.recorder.onstart = () => {
@@ -46,7 +62,13 @@ export default class extends Controller {
             type: 'audio/ogg; codecs=opus',
           })
 
-          this.uploadRecording()
+          if (this.socket?.readyState === WebSocket.OPEN) {
+            // the server already has the audio, so only the last chunk is left to transcribe
+            this.showIcon('loading')
+            this.socket.send('stop')
+          } else {
+            this.uploadRecording()
+          }
 
           this.audioChunks = []
         }
@@ -75,10 +97,42 @@ export default class extends Controller {
     if (this.recorder?.state === 'recording') {
       this.recorder.stop()
     } else {
-      this.recorder?.start()
+      this.openSocket()
+      this.recorder?.start(this.timesliceValue)
     }
   }
 
+  openSocket(): void {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
+    const profile = encodeURIComponent(this.profileTarget.value)
+    const socket = new WebSocket(
+      `${protocol}//${window.location.host}/recordings/live?profile=${profile}`
+    )
+    let answered = false
+
+    socket.onopen = () => {
+      // send the chunks recorded while the connection was opening
+      this.audioChunks.forEach((chunk) => {
+        socket.send(chunk)
+      })
+    }
+
+    socket.onmessage = (event: MessageEvent<string>) => {
+      answered = true
+      Turbo.renderStreamMessage(event.data)
+    }
+
+    socket.onclose = () => {
+      this.socket = null
+      // fall back on a regular upload when the live upload failed after recording stopped
+      if (!answered && this.recorder?.state !== 'recording') {
+        this.uploadRecording()
+      }
+    }
+
+    this.socket = socket
+  }
+
   uploadRecording(): void {
     if (this.audioRecording) {
       this.showIcon('loading')
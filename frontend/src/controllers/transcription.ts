@@ -4,6 +4,14 @@ import type { TinyMCE } from 'tinymce'
 declare let tinymce: TinyMCE
 
 export default class extends Controller {
+  pretranslateTimer: ReturnType<typeof setTimeout> | null = null
+
+  declare pretranslateDelayValue: number
+  static values = {
+    // how long, in milliseconds, editing must pause before translations are prepared
+    pretranslateDelay: { type: Number, default: 1500 },
+  }
+
   declare readonly messageInputTarget: HTMLInputElement
   declare readonly formattedMessageTarget: HTMLInputElement
   declare readonly imageInputTarget: HTMLInputElement
@@ -18,9 +26,43 @@ export default class extends Controller {
       menubar: false,
       toolbar: 'undo redo | bold italic | link image',
       statusbar: false,
+      setup: (editor) => {
+        editor.on('init change keyup', () => {
+          this.schedulePretranslate()
+        })
+      },
     })
   }
 
+  disconnect(): void {
+    if (this.pretranslateTimer) {
+      clearTimeout(this.pretranslateTimer)
+    }
+  }
+
+  schedulePretranslate(): void {
+    if (this.pretranslateTimer) {
+      clearTimeout(this.pretranslateTimer)
+    }
+    this.pretranslateTimer = setTimeout(() => {
+      void this.pretranslate()
+    }, this.pretranslateDelayValue)
+  }
+
+  async pretranslate(): Promise<void> {
+    const content = tinymce.activeEditor?.getContent()
+    if (!content) {
+      return
+    }
+    const body = new FormData()
+    body.append('formatted_message', content)
+    try {
+      await fetch('/pretranslate', { method: 'POST', body })
+    } catch {
+      // translations are prepared again when the message is published
+    }
+  }
+
   publish(): void {
     const content = tinymce.activeEditor?.getContent()
     if (content) {